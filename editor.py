@@ -1,43 +1,162 @@
 #!/usr/bin/env python3
-import json, os, sys
-from typing import List, Dict, Any
+import base64, copy, hashlib, json, os, re, sys
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional
+
+# orjson is optional: same output as json.dumps(indent=2), but much faster
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# readline is optional too (absent on Windows): line editing, history and completion for input()
+try:
+    import readline
+except ImportError:
+    readline = None
 
 DATA_DIR = 'data'
 LVL_DIR = os.path.join(DATA_DIR, 'levels')
 
 T_EMPTY, T_WALL, T_TOWN, T_STAIRS_D, T_STAIRS_U = 0, 1, 2, 3, 4
+# Level grid encoding: v2 = {"w","h","cells": base64 of row-major tile bytes}; absent = nested int lists
+GRID_V = 2
+# Ids in a comma-separated list; ids never contain spaces, so whitespace also separates
+_CSV_IDS = re.compile(r'[^,\s]+')
+
+# Parsed level files keyed by path: (st_mtime_ns, data)
+_LVL_CACHE: Dict[str, Any] = {}
+
+# Encoding buffer reused across saves; dropped if a save grows it past the cap
+_ENC_BUF = bytearray()
+_ENC_BUF_MAX = 128 * 1024
+
+# Directories already created (or found) by save_json; skips the makedirs syscalls after the first save
+_KNOWN_DIRS: set = set()
+
+# path -> (digest of the bytes we last wrote, st_mtime_ns right after writing)
+_LAST_WRITE: Dict[str, Any] = {}
+
+def _dumps(data) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode()
+
+def _loads(raw: bytes):
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
 
 def load_json(path, default):
     try:
-        with open(path) as f:
-            return json.load(f)
+        with open(path, 'rb') as f:
+            return _loads(f.read())
     except Exception:
         return default
 
+def load_json_cached(path, default):
+    # Returns a private copy so callers can mutate it freely
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return default
+    hit = _LVL_CACHE.get(path)
+    if hit is None or hit[0] != mtime:
+        data = load_json(path, None)
+        if data is None:
+            return default
+        hit = _LVL_CACHE[path] = (mtime, data)
+    return copy.deepcopy(hit[1])
+
+def _mtime_ns(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
 def save_json(path, data):
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, 'w') as f:
-        json.dump(data, f, indent=2)
-    print(f"Saved {path}")
+    global _ENC_BUF
+    _ENC_BUF[:] = _dumps(data)
+    digest = hashlib.blake2b(_ENC_BUF, digest_size=16).digest()
+    # Same bytes as our last write and nobody touched the file since: nothing to do
+    if _LAST_WRITE.get(path) == (digest, _mtime_ns(path)):
+        print(f"No changes to {path}")
+    else:
+        d = os.path.dirname(path)
+        if d not in _KNOWN_DIRS:
+            os.makedirs(d, exist_ok=True); _KNOWN_DIRS.add(d)
+        # Write beside the target and rename over it so a crash never leaves a torn file
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(memoryview(_ENC_BUF))
+        os.replace(tmp, path)
+        mtime = _mtime_ns(path)
+        _LAST_WRITE[path] = (digest, mtime)
+        if path in _LVL_CACHE:
+            _LVL_CACHE[path] = (mtime, copy.deepcopy(data))
+        print(f"Saved {path}")
+    if len(_ENC_BUF) > _ENC_BUF_MAX:
+        _ENC_BUF = bytearray()
+
+def _complete_command(text, state):
+    # Only the first word of a line is a command
+    if readline.get_line_buffer()[:readline.get_begidx()].strip():
+        return None
+    matches = [c for c in LEVEL_COMMANDS if c.startswith(text.lower())]
+    return matches[state] if state < len(matches) else None
+
+def setup_readline():
+    if readline is None: return
+    readline.parse_and_bind('tab: complete')
+    readline.set_history_length(1000)
+    readline.set_completer(_complete_command)
+
+def write_lines(lines):
+    # One write per redraw instead of a print per line
+    sys.stdout.write('\n'.join(lines) + '\n')
 
 def prompt(msg, default=None):
     s = input(f"{msg}{' ['+str(default)+']' if default is not None else ''}: ")
     return s if s.strip() else default
 
+# Editable fields and their types; the edit prompts cast through these
+MONSTER_SCHEMA = {'id': str, 'name': str, 'hp_low': int, 'hp_high': int, 'ac': int, 'atk_low': int, 'atk_high': int,
+                  'exp': int, 'gold_low': int, 'gold_high': int, 'agi': int}
+# Items carry different stat fields per type, so this is keyed by field rather than by type
+ITEM_SCHEMA = {'id': str, 'name': str, 'type': str, 'price': int, 'heal': int, 'heal_low': int, 'heal_high': int,
+               'mp_low': int, 'mp_high': int, 'atk': int, 'ac': int, 'agi': int}
+SKILL_SCHEMA = {'id': str, 'name': str, 'mp_cost': int}
+
+def index_by_id(records):
+    return {r.get('id'): i for i, r in enumerate(records)}
+
+def edit_fields(rec, schema, keys):
+    for k in keys:
+        cast = schema.get(k)
+        if cast is None: continue  # not a scalar field we know how to edit
+        val = prompt(k, rec.get(k))
+        if val is not None: rec[k] = cast(val)
+
 # -------- Monsters --------
 def monsters_menu():
     path = os.path.join(DATA_DIR, 'monsters.json')
     data: List[Dict[str, Any]] = load_json(path, [])
+    by_id = index_by_id(data)
+    dirty = False
     while True:
-        print("\nMonsters:")
-        for i, m in enumerate(data):
-            print(f" {i+1}. {m.get('id')} — {m.get('name')}")
-        print(" a) Add  e) Edit  d) Delete  q) Back")
+        write_lines(["\nMonsters:"]
+                    + [f" {i+1}. {m.get('id')} — {m.get('name')}" for i, m in enumerate(data)]
+                    + [" a) Add  e) Edit  d) Delete  w) Save  q) Back"])
         ch = input("> ").strip().lower()
         if ch == 'q':
+            if dirty: save_json(path, data)
             break
+        elif ch == 'w':
+            save_json(path, data); dirty = False
         elif ch == 'a':
             mid = prompt('id')
+            if mid in by_id:
+                print(f"Monster id '{mid}' already exists"); continue
             name = prompt('name', mid)
             hp_low = int(prompt('hp_low', 6)); hp_high = int(prompt('hp_high', 10))
             ac = int(prompt('ac', 8))
@@ -48,40 +167,46 @@ def monsters_menu():
             data.append({"id": mid, "name": name, "hp_low": hp_low, "hp_high": hp_high, "ac": ac,
                          "atk_low": atk_low, "atk_high": atk_high, "exp": exp, "gold_low": gold_low,
                          "gold_high": gold_high, "agi": agi})
-            save_json(path, data)
+            by_id[mid] = len(data) - 1
+            dirty = True
         elif ch == 'e':
             i = int(prompt('index')) - 1
             if 0 <= i < len(data):
-                m = data[i]
-                for k in ["id","name","hp_low","hp_high","ac","atk_low","atk_high","exp","gold_low","gold_high","agi"]:
-                    val = prompt(k, m.get(k))
-                    m[k] = int(val) if isinstance(m.get(k), int) else val
-                save_json(path, data)
+                edit_fields(data[i], MONSTER_SCHEMA, MONSTER_SCHEMA)
+                by_id = index_by_id(data); dirty = True
         elif ch == 'd':
             i = int(prompt('index')) - 1
             if 0 <= i < len(data):
                 data.pop(i)
-                save_json(path, data)
+                by_id = index_by_id(data); dirty = True
 
 # -------- Items --------
 def items_menu():
     ipath = os.path.join(DATA_DIR, 'items.json')
     spath = os.path.join(DATA_DIR, 'shop.json')
     items: List[Dict[str, Any]] = load_json(ipath, [])
-    shop_ids: List[str] = load_json(spath, [it.get('id') for it in items])
+    by_id = index_by_id(items)
+    # dict as an ordered set: O(1) membership, keeps the in-game shelf order
+    shop_ids: Dict[str, None] = dict.fromkeys(load_json(spath, [it.get('id') for it in items]))
+    items_dirty = shop_dirty = False
     def save_all():
-        save_json(ipath, items)
-        save_json(spath, shop_ids)
+        nonlocal items_dirty, shop_dirty
+        if items_dirty: save_json(ipath, items)
+        if shop_dirty: save_json(spath, list(shop_ids))
+        items_dirty = shop_dirty = False
     while True:
-        print("\nItems:")
-        for i, it in enumerate(items):
-            stock = ' [shop]' if it.get('id') in shop_ids else ''
-            print(f" {i+1}. {it.get('id')} — {it.get('name')} ({it.get('type')}){stock}")
-        print(" a) Add  e) Edit  d) Delete  s) Toggle shop stock  q) Back")
+        write_lines(["\nItems:"]
+                    + [f" {i+1}. {it.get('id')} — {it.get('name')} ({it.get('type')}){' [shop]' if it.get('id') in shop_ids else ''}"
+                       for i, it in enumerate(items)]
+                    + [" a) Add  e) Edit  d) Delete  s) Toggle shop stock  w) Save  q) Back"])
         ch = input("> ").strip().lower()
-        if ch == 'q': break
+        if ch == 'q':
+            save_all(); break
+        elif ch == 'w': save_all()
         elif ch == 'a':
             iid = prompt('id')
+            if iid in by_id:
+                print(f"Item id '{iid}' already exists"); continue
             name = prompt('name', iid)
             typ = prompt('type [consumable|weapon|armor|accessory]', 'consumable')
             price = int(prompt('price', 10))
@@ -95,157 +220,233 @@ def items_menu():
             elif typ == 'accessory':
                 stat = prompt('stat [agi/ac]', 'agi')
                 it[stat] = int(prompt(stat, 1))
-            items.append(it); save_all()
+            items.append(it); by_id[iid] = len(items) - 1; items_dirty = True
         elif ch == 'e':
             i = int(prompt('index')) - 1
             if 0 <= i < len(items):
-                it = items[i]
-                for k in list(it.keys()):
-                    val = prompt(k, it.get(k)); it[k] = int(val) if isinstance(it.get(k), int) else val
-                save_all()
+                edit_fields(items[i], ITEM_SCHEMA, list(items[i]))
+                by_id = index_by_id(items); items_dirty = True
         elif ch == 'd':
             i = int(prompt('index')) - 1
             if 0 <= i < len(items):
-                iid = items[i].get('id'); items.pop(i)
-                if iid in shop_ids: shop_ids.remove(iid)
-                save_all()
+                iid = items[i].get('id'); items.pop(i); by_id = index_by_id(items); items_dirty = True
+                if iid in shop_ids: del shop_ids[iid]; shop_dirty = True
         elif ch == 's':
             i = int(prompt('index')) - 1
             if 0 <= i < len(items):
                 iid = items[i].get('id')
-                if iid in shop_ids: shop_ids.remove(iid)
-                else: shop_ids.append(iid)
-                save_all()
+                if iid in shop_ids: del shop_ids[iid]
+                else: shop_ids[iid] = None
+                shop_dirty = True
 
 # -------- Skills --------
 def skills_menu():
     path = os.path.join(DATA_DIR, 'skills.json')
     data = load_json(path, {"classes": {}})
     classes: Dict[str, List[Dict[str, Any]]] = data.setdefault('classes', {})
+    dirty = False
     while True:
-        print("\nClasses:")
-        for cname, skills in classes.items():
-            print(f" - {cname}: {[s.get('name') for s in skills]}")
-        print(" a) Add class  e) Edit class  d) Delete class  q) Back")
+        write_lines(["\nClasses:"]
+                    + [f" - {cname}: {[s.get('name') for s in skills]}" for cname, skills in classes.items()]
+                    + [" a) Add class  e) Edit class  d) Delete class  w) Save  q) Back"])
         ch = input("> ").strip().lower()
-        if ch == 'q': break
+        if ch == 'q':
+            if dirty: save_json(path, data)
+            break
+        elif ch == 'w':
+            save_json(path, data); dirty = False
         elif ch == 'a':
             cname = prompt('class name')
-            classes.setdefault(cname, []); save_json(path, data)
+            classes.setdefault(cname, []); dirty = True
         elif ch == 'd':
             cname = prompt('class name')
-            classes.pop(cname, None); save_json(path, data)
+            classes.pop(cname, None); dirty = True
         elif ch == 'e':
             cname = prompt('class name')
             skills = classes.setdefault(cname, [])
             while True:
-                print(f"\nSkills for {cname}:")
-                for i, s in enumerate(skills):
-                    print(f" {i+1}. {s.get('id')} — {s.get('name')} (mp {s.get('mp_cost',0)})")
-                print(" a) Add  e) Edit  d) Delete  b) Back")
+                write_lines([f"\nSkills for {cname}:"]
+                            + [f" {i+1}. {s.get('id')} — {s.get('name')} (mp {s.get('mp_cost',0)})" for i, s in enumerate(skills)]
+                            + [" a) Add  e) Edit  d) Delete  b) Back"])
                 c2 = input("> ").strip().lower()
                 if c2 == 'b': break
                 elif c2 == 'a':
                     sid = prompt('id'); name = prompt('name', sid); mp = int(prompt('mp_cost', 1))
-                    skills.append({"id": sid, "name": name, "mp_cost": mp}); save_json(path, data)
+                    skills.append({"id": sid, "name": name, "mp_cost": mp}); dirty = True
                 elif c2 == 'e':
                     i = int(prompt('index')) - 1
                     if 0 <= i < len(skills):
-                        s = skills[i]
-                        for k in ["id","name","mp_cost"]:
-                            v = prompt(k, s.get(k)); s[k] = int(v) if k=='mp_cost' else v
-                        save_json(path, data)
+                        edit_fields(skills[i], SKILL_SCHEMA, SKILL_SCHEMA)
+                        dirty = True
                 elif c2 == 'd':
                     i = int(prompt('index')) - 1
                     if 0 <= i < len(skills):
-                        skills.pop(i); save_json(path, data)
+                        skills.pop(i); dirty = True
 
 # -------- Levels --------
+# Grids are lists of bytearray rows (one byte per tile); JSON keeps nested int lists
+_TILE_TRANS = bytes.maketrans(bytes(range(256)), b' #TDU' + b'?'*251)
+
+def fill_rect(grid, x1, y1, x2, y2, t):
+    # Inclusive corners in any order; clipped to the grid, one slice store per row
+    xa,xb=sorted((x1,x2)); ya,yb=sorted((y1,y2))
+    xa=max(0,xa); xb=min(len(grid[0])-1,xb)
+    if xa>xb: return
+    fill=bytes([t])*(xb-xa+1)
+    for y in range(max(0,ya), min(len(grid)-1,yb)+1):
+        grid[y][xa:xb+1]=fill
+
 def base_grid(w=24,h=24):
-    g=[[1]*w for _ in range(h)]
-    for y in range(1,h-1):
-        for x in range(1,w-1):
-            g[y][x]=0
+    g=[bytearray([T_WALL])*w for _ in range(h)]
+    fill_rect(g, 1, 1, w-2, h-2, T_EMPTY)
     return g
 
+def grid_from_json(data):
+    g=data.get('grid')
+    if not g: return None
+    if data.get('grid_v')==GRID_V:
+        w,h=g['w'],g['h']; raw=base64.b64decode(g['cells'])
+        return [bytearray(raw[y*w:(y+1)*w]) for y in range(h)]
+    w=len(g[0])
+    return [bytearray(row[:w]).ljust(w, bytes([T_WALL])) for row in g]
+
+def grid_to_json(data, grid):
+    data['grid']={'w': len(grid[0]), 'h': len(grid), 'cells': base64.b64encode(b''.join(grid)).decode('ascii')}
+    data['grid_v']=GRID_V
+
+def grid_text(grid):
+    return b'\n'.join(row.translate(_TILE_TRANS) for row in grid).decode('ascii')
+
 def print_grid(grid):
-    ch={0:' ',1:'#',2:'T',3:'D',4:'U'}
-    for y,row in enumerate(grid):
-        print(''.join(ch.get(v,'?') for v in row))
+    # Whole map in one write instead of a print per row
+    sys.stdout.write(grid_text(grid) + '\n')
+
+@dataclass
+class LevelSession:
+    """Levels touched in one level_menu visit, with decoded grids; written back on flush."""
+    ix: int = 0
+    levels: Dict[int, Dict[str, Any]] = field(default_factory=dict)
+    dirty: set = field(default_factory=set)
+    monster_ids: Optional[Dict[str, int]] = None  # loaded on first 'monsters' command, for validation only
+
+    def level(self, n=None):
+        n=self.ix if n is None else n
+        lvl=self.levels.get(n)
+        if lvl is None:
+            lvl=load_json_cached(os.path.join(LVL_DIR, f'level{n}.json'), {})
+            lvl['grid']=grid_from_json(lvl) or base_grid()
+            lvl.pop('grid_v', None)
+            if not lvl.get('encounters'): lvl['encounters']={"monsters": [], "group": [1,3]}
+            self.levels[n]=lvl
+        return lvl
+
+    def flush(self):
+        for n in sorted(self.dirty):
+            lvl=self.levels[n]
+            data={k: v for k, v in lvl.items() if k!='grid' and v}
+            if n!=0: data.pop('town_portal', None)
+            grid_to_json(data, lvl['grid'])
+            save_json(os.path.join(LVL_DIR, f'level{n}.json'), data)
+        self.dirty.clear()
+
+def _lvl_show(s, args):
+    lvl=s.level()
+    write_lines([grid_text(lvl['grid']), f"stairs_down={lvl.get('stairs_down')} stairs_up={lvl.get('stairs_up')} town_portal={lvl.get('town_portal')}", f"encounters: {lvl['encounters']}"])
+
+def _valid_tile(t):
+    # Rows are bytearrays, so anything outside the advertised tile ids would raise on store
+    if T_EMPTY<=t<=T_STAIRS_U: return True
+    print(f"Tile must be {T_EMPTY}..{T_STAIRS_U}, got {t}"); return False
+
+def _lvl_set(s, args):
+    x,y,t=map(int,args); grid=s.level()['grid']
+    if not _valid_tile(t): return
+    if 0<=y<len(grid) and 0<=x<len(grid[0]):
+        grid[y][x]=t; s.dirty.add(s.ix)
+
+def _lvl_rect(s, args):
+    x1,y1,x2,y2,t=map(int,args)
+    if not _valid_tile(t): return
+    fill_rect(s.level()['grid'],x1,y1,x2,y2,t); s.dirty.add(s.ix)
+
+def _lvl_stairsdown(s, args):
+    x,y,tgt=map(int,args); lvl=s.level()
+    lvl['stairs_down']=[x,y]; lvl['grid'][y][x]=T_STAIRS_D; s.dirty.add(s.ix)
+    # set backlink in target level as stairs_up at same coords by default
+    tlvl=s.level(tgt); tgrid=tlvl['grid']
+    tlvl['stairs_up']=[x,y]
+    if 0<=y<len(tgrid) and 0<=x<len(tgrid[0]): tgrid[y][x]=T_STAIRS_U
+    s.dirty.add(tgt)
+
+def _lvl_stairsup(s, args):
+    x,y=map(int,args); lvl=s.level()
+    lvl['stairs_up']=[x,y]; lvl['grid'][y][x]=T_STAIRS_U; s.dirty.add(s.ix)
+
+def _lvl_town(s, args):
+    if s.ix!=0:
+        print('Town link only allowed on level 0'); return
+    x,y=map(int,args); lvl=s.level()
+    lvl['town_portal']=[x,y]; lvl['grid'][y][x]=T_TOWN; s.dirty.add(s.ix)
+
+def _lvl_monsters(s, args):
+    enc=s.level()['encounters']
+    print(f"Current allowed monsters: {enc.get('monsters', [])} group={enc.get('group',[1,3])}")
+    ids = prompt('ids (comma-separated)', ','.join(enc.get('monsters', [])))
+    group = prompt('group (min,max)', '1,3')
+    try:
+        mins,maxs=map(int,group.split(',')); enc['group']=[mins,maxs]
+    except:
+        pass
+    enc['monsters']=_CSV_IDS.findall(ids)
+    if s.monster_ids is None:
+        s.monster_ids=index_by_id(load_json(os.path.join(DATA_DIR, 'monsters.json'), []))
+    unknown=[m for m in enc['monsters'] if m not in s.monster_ids]
+    if unknown: print(f"Warning: unknown monster ids {unknown}")
+    s.dirty.add(s.ix)
+
+def _lvl_save(s, args):
+    s.flush()
+
+# command -> (argument count or None for any, handler)
+LEVEL_HANDLERS = {
+    'show': (None, _lvl_show),
+    'set': (3, _lvl_set),
+    'rect': (5, _lvl_rect),
+    'stairsdown': (3, _lvl_stairsdown),
+    'stairsup': (2, _lvl_stairsup),
+    'town': (2, _lvl_town),
+    'monsters': (None, _lvl_monsters),
+    'save': (None, _lvl_save),
+}
+LEVEL_COMMANDS = [*LEVEL_HANDLERS, 'back']
 
 def level_menu():
-    os.makedirs(LVL_DIR, exist_ok=True)
+    sess=LevelSession()
     while True:
         print("\nLevel editor: enter level index (number) or q to return")
         s= input("> ").strip().lower()
-        if s=='q': break
+        if s=='q':
+            sess.flush(); break
         try:
-            ix=int(s)
+            sess.ix=int(s)
         except:
             continue
-        path=os.path.join(LVL_DIR, f'level{ix}.json')
-        data=load_json(path, {})
-        grid=data.get('grid') or base_grid()
-        enc=data.get('encounters') or {"monsters": [], "group": [1,3]}
-        stairs_down=data.get('stairs_down')
-        stairs_up=data.get('stairs_up')
-        town=data.get('town_portal')
+        sess.level()
         while True:
-            print(f"\nEditing level {ix}. Commands: show, set x y tile(0..4), rect x1 y1 x2 y2 tile, stairsdown x y targetLevel, stairsup x y, town x y, monsters, save, back")
+            print(f"\nEditing level {sess.ix}. Commands: show, set x y tile(0..4), rect x1 y1 x2 y2 tile, stairsdown x y targetLevel, stairsup x y, town x y, monsters, save, back")
             cmd=input("> ").strip().lower().split()
             if not cmd: continue
-            if cmd[0]=='back': break
-            if cmd[0]=='show':
-                print_grid(grid)
-                print(f"stairs_down={stairs_down} stairs_up={stairs_up} town_portal={town}")
-                print(f"encounters: {enc}")
-            elif cmd[0]=='set' and len(cmd)==4:
-                x,y,t=map(int,cmd[1:])
-                if 0<=y<len(grid) and 0<=x<len(grid[0]):
-                    grid[y][x]=t
-            elif cmd[0]=='rect' and len(cmd)==6:
-                x1,y1,x2,y2,t=map(int,cmd[1:])
-                for y in range(min(y1,y2), max(y1,y2)+1):
-                    for x in range(min(x1,x2), max(x1,x2)+1):
-                        if 0<=y<len(grid) and 0<=x<len(grid[0]): grid[y][x]=t
-            elif cmd[0]=='stairsdown' and len(cmd)==4:
-                x,y,tgt=map(int,cmd[1:])
-                stairs_down=[x,y]; grid[y][x]=T_STAIRS_D
-                # set backlink in target level as stairs_up at same coords by default
-                tpath=os.path.join(LVL_DIR, f'level{tgt}.json')
-                tdata=load_json(tpath,{})
-                tgrid=tdata.get('grid') or base_grid()
-                tdata['grid']=tgrid
-                tdata['stairs_up']=[x,y]
-                if 0<=y<len(tgrid) and 0<=x<len(tgrid[0]): tgrid[y][x]=T_STAIRS_U
-                save_json(tpath,tdata)
-            elif cmd[0]=='stairsup' and len(cmd)==3:
-                x,y=map(int,cmd[1:]); stairs_up=[x,y]; grid[y][x]=T_STAIRS_U
-            elif cmd[0]=='town' and len(cmd)==3:
-                if ix!=0:
-                    print('Town link only allowed on level 0'); continue
-                x,y=map(int,cmd[1:]); town=[x,y]; grid[y][x]=T_TOWN
-            elif cmd[0]=='monsters':
-                print(f"Current allowed monsters: {enc.get('monsters', [])} group={enc.get('group',[1,3])}")
-                ids = prompt('ids (comma-separated)', ','.join(enc.get('monsters', [])))
-                group = prompt('group (min,max)', '1,3')
-                try:
-                    mins,maxs=map(int,group.split(',')); enc['group']=[mins,maxs]
-                except:
-                    pass
-                enc['monsters']=[i.strip() for i in ids.split(',') if i.strip()]
-            elif cmd[0]=='save':
-                data={'grid': grid, 'encounters': enc}
-                if stairs_down: data['stairs_down']=stairs_down
-                if stairs_up: data['stairs_up']=stairs_up
-                if town and ix==0: data['town_portal']=town
-                save_json(path,data)
+            if cmd[0]=='back':
+                sess.flush()
+                break
+            h=LEVEL_HANDLERS.get(cmd[0])
+            if h and (h[0] is None or len(cmd)-1==h[0]):
+                h[1](sess, cmd[1:])
 
 def main():
-    os.makedirs(DATA_DIR, exist_ok=True)
+    setup_readline()
     while True:
-        print("\nData Editor")
-        print(" 1) Monsters\n 2) Items + Shop\n 3) Skills\n 4) Levels\n q) Quit")
+        write_lines(["\nData Editor", " 1) Monsters\n 2) Items + Shop\n 3) Skills\n 4) Levels\n q) Quit"])
         ch = input("> ").strip().lower()
         if ch == '1': monsters_menu()
         elif ch == '2': items_menu()
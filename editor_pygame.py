@@ -1,10 +1,17 @@
 #!/usr/bin/env python3
-import os, sys, json
+import os, sys, json, base64
+import functools
 import random
 from typing import List, Dict, Any, Optional, Tuple
 
 import pygame
 
+# orjson is optional: same output as json.dumps(indent=2), but much faster
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Tile constants (match main.py)
 T_EMPTY, T_WALL, T_TOWN, T_STAIRS_D, T_STAIRS_U, T_LOCKED = 0, 1, 2, 3, 4, 5
 TOOL_CHEST = 6  # editor-only tool id for chests
@@ -12,12 +19,13 @@ TOOL_CHEST = 6  # editor-only tool id for chests
 DATA_DIR = 'data'
 LEVEL_DIR = os.path.join(DATA_DIR, 'levels')
 DEFAULT_W, DEFAULT_H = 24, 24
-W, H = DEFAULT_W, DEFAULT_H
 TILE = 20
 MARGIN = 10
 PALETTE_W = 260
-def window_dims():
-    return (MARGIN * 2 + W * TILE + PALETTE_W, MARGIN * 2 + H * TILE)
+TEXT_CACHE_MAX = 512  # rendered label surfaces kept by Editor.render_text
+DOC_CACHE_MAX = 16  # open levels kept in memory by Editor._get_doc
+def window_dims(w: int, h: int):
+    return (MARGIN * 2 + w * TILE + PALETTE_W, MARGIN * 2 + h * TILE)
 
 WHITE = (240, 240, 240)
 GRAY = (140, 140, 140)
@@ -27,38 +35,89 @@ YELLOW = (240, 220, 80)
 RED = (220, 80, 80)
 GREEN = (90, 200, 120)
 BLUE = (80, 160, 240)
+FLOOR = (30, 30, 34)
+# Palette tools in display order
+TOOLS = [
+    (T_EMPTY, 'Empty'),
+    (T_WALL, 'Wall'),
+    (T_TOWN, 'Town (L0)'),
+    (T_STAIRS_D, 'Stairs Down'),
+    (T_STAIRS_U, 'Stairs Up'),
+    (T_LOCKED, 'Locked Door'),
+    (TOOL_CHEST, 'Chest'),
+]
+# Tiles drawn on a floor background (markers add an icon on top)
+FLOOR_TILES = (T_EMPTY, T_TOWN, T_STAIRS_D, T_STAIRS_U, T_LOCKED)
+# Level markers; generators never overwrite these cells
+MARKER_TILES = frozenset((T_TOWN, T_STAIRS_D, T_STAIRS_U))
+
+# A grid is a list of bytearray rows, one byte per tile; JSON files keep nested int lists
+Grid = List[bytearray]
+
+def wall_grid(w: int, h: int) -> Grid:
+    return [bytearray([T_WALL]) * w for _ in range(h)]
 
-def base_grid() -> List[List[int]]:
-    g = [[T_WALL] * W for _ in range(H)]
-    for y in range(1, H-1):
-        for x in range(1, W-1):
-            g[y][x] = T_EMPTY
+def base_grid(w: int, h: int) -> Grid:
+    inner = bytes([T_WALL]) + bytes([T_EMPTY]) * (w-2) + bytes([T_WALL])
+    g = wall_grid(w, h)
+    for y in range(1, h-1):
+        g[y][:] = inner
     return g
 
+def unpack_grid(g: Dict[str, Any]) -> Grid:
+    # Packed grid (grid_v 2, written by editor.py): base64 of row-major tile bytes
+    w, h = int(g['w']), int(g['h'])
+    raw = base64.b64decode(g['cells'])
+    return [bytearray(raw[y*w:(y+1)*w]) for y in range(h)]
+
+def _dumps(data) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode()
+
+def _loads(raw: bytes):
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
 def load_json(path, default):
     try:
-        with open(path) as f:
-            return json.load(f)
+        with open(path, 'rb') as f:
+            return _loads(f.read())
     except Exception:
         return default
 
 def save_json(path, data):
     os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, 'w') as f:
-        json.dump(data, f, indent=2)
+    # Write beside the target and rename over it so a crash never leaves a torn file
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(_dumps(data))
+    os.replace(tmp, path)
+
+# Monster/item lists only feed the pickers; parse them once per process and share
+@functools.cache
+def _load_monsters() -> List[Dict[str, Any]]:
+    return load_json(os.path.join(DATA_DIR, 'monsters.json'), [])
+
+@functools.cache
+def _load_items() -> List[Dict[str, Any]]:
+    return load_json(os.path.join(DATA_DIR, 'items.json'), [])
 
 class LevelDoc:
     def __init__(self, index: int):
         self.index = index
         self.path = os.path.join(LEVEL_DIR, f'level{index}.json')
         self.data: Dict[str, Any] = {}
-        self.grid: List[List[int]] = base_grid()
+        # Canvas size; every grid operation on this level goes through it
+        self.w, self.h = DEFAULT_W, DEFAULT_H
+        self.grid: Grid = []  # allocated once by load(), after the size is known
         self.stairs_down: Optional[Tuple[int, int]] = None
         self.stairs_up: Optional[Tuple[int, int]] = None
         self.town_portal: Optional[Tuple[int, int]] = (2, 2) if index == 0 else None
-        self.encounters: Dict[str, Any] = {"monsters": [], "group": [1, 3]}
+        # encounters['monsters'] is a dict used as an ordered set of ids; saved as a list
+        self.encounters: Dict[str, Any] = {"monsters": {}, "group": [1, 3]}
         self.chests: List[Dict[str, Any]] = []
-        self.size: Tuple[int, int] = (W, H)
         self.load()
 
     def load(self):
@@ -68,30 +127,33 @@ class LevelDoc:
         if isinstance(sz, list) and len(sz) == 2:
             try:
                 nw, nh = int(sz[0]), int(sz[1])
-                nw = max(8, min(64, nw)); nh = max(8, min(64, nh))
-                self.size = (nw, nh)
-                # update globals for base_grid/grid operations
-                global W, H
-                W, H = nw, nh
+                self.w = max(8, min(64, nw)); self.h = max(8, min(64, nh))
             except Exception:
                 pass
         g = self.data.get('grid')
-        if isinstance(g, list) and g and isinstance(g[0], list):
+        if self.data.get('grid_v') == 2 and isinstance(g, dict):
+            g = unpack_grid(g)
+        if isinstance(g, list) and g and isinstance(g[0], (list, bytearray)):
             # size adjust
-            self.grid = base_grid()
-            for y in range(min(H, len(g))):
-                for x in range(min(W, len(g[0]))):
-                    try:
-                        self.grid[y][x] = int(g[y][x])
-                    except Exception:
-                        pass
+            self.grid = base_grid(self.w, self.h)
+            for y, src in enumerate(g[:self.h]):
+                src = src[:self.w]
+                try:
+                    self.grid[y][:len(src)] = bytes(src)
+                except (TypeError, ValueError):
+                    for x, v in enumerate(src):
+                        try:
+                            self.grid[y][x] = int(v)
+                        except Exception:
+                            pass
         else:
-            self.grid = base_grid()
+            self.grid = base_grid(self.w, self.h)
         sd = self.data.get('stairs_down'); su = self.data.get('stairs_up'); tp = self.data.get('town_portal')
         self.stairs_down = tuple(sd) if isinstance(sd, list) and len(sd)==2 else None
         self.stairs_up = tuple(su) if isinstance(su, list) and len(su)==2 else None
         self.town_portal = tuple(tp) if isinstance(tp, list) and len(tp)==2 else (self.town_portal if self.index==0 else None)
         self.encounters = self.data.get('encounters', self.encounters)
+        self.encounters['monsters'] = dict.fromkeys(self.encounters.get('monsters') or ())
         # Load chests
         ch = self.data.get('chests', [])
         if isinstance(ch, list):
@@ -110,12 +172,13 @@ class LevelDoc:
             x,y = self.stairs_down; self.grid[y][x] = T_STAIRS_D
         if self.stairs_up:
             x,y = self.stairs_up; self.grid[y][x] = T_STAIRS_U
+        self._saved = _dumps(self._payload())
 
-    def save(self):
+    def _payload(self) -> Dict[str, Any]:
         d: Dict[str, Any] = {
-            'grid': self.grid,
-            'encounters': self.encounters,
-            'size': [W, H],
+            'grid': [list(row) for row in self.grid],
+            'encounters': {**self.encounters, 'monsters': list(self.encounters['monsters'])},
+            'size': [self.w, self.h],
         }
         if self.chests:
             d['chests'] = list(self.chests)
@@ -123,19 +186,44 @@ class LevelDoc:
         if self.stairs_up: d['stairs_up'] = list(self.stairs_up)
         if self.index == 0 and self.town_portal:
             d['town_portal'] = list(self.town_portal)
+        return d
+
+    def save(self):
+        d = self._payload()
         save_json(self.path, d)
+        self._saved = _dumps(d)
+
+    def modified(self) -> bool:
+        # Compared against the last load/save snapshot, so no edit path needs to flag itself
+        return _dumps(self._payload()) != self._saved
+
+def _printable(s: str) -> str:
+    return ''.join(ch for ch in s if ch.isprintable())
+
+def _text_input(read):
+    # Text prompts read TEXTINPUT events (whole IME-composed strings); enable them only while one is open
+    @functools.wraps(read)
+    def wrapper(self, *args):
+        pygame.key.start_text_input()
+        try:
+            return read(self, *args)
+        finally:
+            pygame.key.stop_text_input()
+    return wrapper
 
 class Editor:
     def __init__(self, level_index: int = 0):
         pygame.init()
         pygame.display.set_caption('Level Editor (Pygame)')
-        self.screen = pygame.display.set_mode(window_dims())
         self.font = pygame.font.SysFont(None, 18)
         self.font_small = pygame.font.SysFont(None, 14)
+        self._text_cache: Dict[Tuple[int, str, Tuple[int, int, int]], pygame.Surface] = {}
         os.makedirs(LEVEL_DIR, exist_ok=True)
-        self.doc = LevelDoc(level_index)
-        # Ensure window reflects loaded size
-        self.screen = pygame.display.set_mode(window_dims())
+        # Levels visited this session, least recently used first; unsaved edits survive ,/. hops
+        self._doc_cache: Dict[int, LevelDoc] = {}
+        self.doc = self._get_doc(level_index)
+        # Open the window once, at the loaded level's size
+        self.screen = pygame.display.set_mode(self.window_dims())
         self.running = True
         self.tool = T_WALL  # default draw tool
         self.status = ''
@@ -147,6 +235,11 @@ class Editor:
         self.suggestion_index: int = -1
         self.suggestion_rects: List[pygame.Rect] = []
         # UI state
+        self._palette_x = 0
+        self._palette_labels: List[Tuple[pygame.Surface, Tuple[int, int]]] = []
+        self._menu_boxes: Dict[str, pygame.Rect] = {}
+        self._input_box = pygame.Rect(0,0,0,0)
+        self._input_area = pygame.Rect(0,0,0,0)
         self.tool_rects: List[Tuple[pygame.Rect, int]] = []
         self.btn_file_rect = pygame.Rect(0,0,0,0)
         self.btn_enc_rect = pygame.Rect(0,0,0,0)
@@ -158,21 +251,86 @@ class Editor:
         self.enc_opt_rects: List[Tuple[pygame.Rect, str]] = []
         self.enc_btn_rects: List[Tuple[pygame.Rect, str]] = []
         self.gen_opt_rects: List[Tuple[pygame.Rect, str]] = []
+        # Pre-rendered grid tiles; rebuilt when _grid_dirty is set or doc.grid is replaced
+        self._grid_cache: Optional[pygame.Surface] = None
+        self._grid_src: Optional[Grid] = None
+        self._grid_dirty = True
+        # Geometry derived from the level size and TILE; rebuilt by _rebuild_layout when the level size changes
+        self._layout_size: Optional[Tuple[int, int]] = None
+        self._tile_rects: List[List[pygame.Rect]] = []
+        self._flat_rects: List[pygame.Rect] = []
+        self._scratch_rect = pygame.Rect(0, 0, 0, 0)
+        # One finished tile image per tile type (floor + marker icon), and the palette samples
+        self._tile_atlas: Dict[int, pygame.Surface] = {}
+        self._blank_tile: Optional[pygame.Surface] = None
+        self._floor_layer: Optional[pygame.Surface] = None
+        self._tool_icons: Dict[int, pygame.Surface] = {}
+        # Snapshot of the dimmed screen under an open overlay, and the state it was drawn from
+        self._under: Optional[pygame.Surface] = None
+        self._under_key: Optional[tuple] = None
+        self._overlay_surf: Optional[pygame.Surface] = None
+        # Pre-rendered encounter rows; rebuilt only when the level's monster list changes
+        self._enc_rows: Optional[pygame.Surface] = None
+        self._enc_rows_key: Optional[tuple] = None
+        # Screen rects changed since the last frame, and the state that frame showed;
+        # while that state holds, draw() pushes only these rects instead of flipping
+        self._dirty_rects: List[pygame.Rect] = []
+        self._frame_key: Optional[tuple] = None
+        self._frame_tool: Optional[int] = None
+        # Cell painted by the held left button and the tool it started with, for MOUSEMOTION drag painting
+        self._last_paint: Optional[Tuple[int, int]] = None
+        self._paint_tool: int = T_WALL
+        # Finished menu panels (name -> (state key, screen area, pixels)); their option rects stay on self
+        self._panels: Dict[str, Tuple[tuple, pygame.Rect, pygame.Surface]] = {}
         # Monsters list for encounters UI
-        self.monsters: List[Dict[str, Any]] = load_json(os.path.join(DATA_DIR, 'monsters.json'), [])
+        self.monsters: List[Dict[str, Any]] = _load_monsters()
         # Items list for chest assignment UI
-        self.items: List[Dict[str, Any]] = load_json(os.path.join(DATA_DIR, 'items.json'), [])
+        self.items: List[Dict[str, Any]] = _load_items()
+
+    def _get_doc(self, index: int) -> LevelDoc:
+        d = self._doc_cache.pop(index, None)
+        if d is None:
+            if len(self._doc_cache) >= DOC_CACHE_MAX:
+                # Closing the least recently used level writes out its pending edits
+                old_ix = next(iter(self._doc_cache))
+                old = self._doc_cache.pop(old_ix)
+                if old.modified():
+                    old.save()
+                    self.status = f'Saved edits to level {old_ix} while closing it'
+            d = LevelDoc(index)
+        self._doc_cache[index] = d
+        return d
+
+    def window_dims(self):
+        return window_dims(self.doc.w, self.doc.h)
+
+    def _sync_window(self):
+        # set_mode recreates the window; skip it when the size is unchanged
+        if self.screen.get_size() != self.window_dims():
+            self.screen = pygame.display.set_mode(self.window_dims())
 
     def grid_pos_from_mouse(self, mx, my):
         gx = (mx - MARGIN) // TILE
         gy = (my - MARGIN) // TILE
-        if 0 <= gx < W and 0 <= gy < H:
+        if 0 <= gx < self.doc.w and 0 <= gy < self.doc.h:
             return int(gx), int(gy)
         return None
 
+    def tile_dirty(self, x, y):
+        self._dirty_rects.append(pygame.Rect(MARGIN + x*TILE, MARGIN + y*TILE, TILE, TILE))
+
     def set_tile(self, x, y, t):
         prev = self.doc.grid[y][x]
+        if prev == t:
+            # Repainting the same tile changes nothing; skip the redraw too
+            return
         self.doc.grid[y][x] = t
+        if self._grid_dirty or self._grid_src is not self.doc.grid or self._layout_size != (self.doc.w, self.doc.h):
+            self._grid_dirty = True
+        else:
+            # Cache is current apart from this cell; patch just the one tile in place
+            self._grid_cache.blit(self._tile_atlas.get(t, self._blank_tile), self._tile_rects[y][x])
+        self.tile_dirty(x, y)
         # Update markers
         if t == T_STAIRS_D:
             self.doc.stairs_down = (x, y)
@@ -190,6 +348,23 @@ class Editor:
         elif prev == T_TOWN and self.doc.town_portal == (x, y):
             self.doc.town_portal = None
 
+    def paint_drag(self, pos):
+        # Fill every cell between the last painted one and the pointer so fast drags leave no gaps
+        tool = self._paint_tool
+        if _is_marker(tool) or tool == TOOL_CHEST:
+            # Single-cell tools never drag
+            self._last_paint = None
+            return
+        gp = self.grid_pos_from_mouse(*pos)
+        if gp is None or gp == self._last_paint:
+            return
+        (x0, y0), (x1, y1) = self._last_paint, gp
+        for x, y in _line_cells(x0, y0, x1, y1):
+            self.set_tile(x, y, tool)
+        self._last_paint = gp
+        if self._dirty_rects:
+            self._dirty = True
+
     def prompt_input(self, prompt_text: str):
         self.input_active = True
         self.input_prompt = prompt_text
@@ -214,220 +389,388 @@ class Editor:
             self.status = 'Invalid position'
             return
         # Ensure target level exists and has an upstairs backlink
+        # Only the one cell goes to disk: a cached copy of the target may hold unsaved
+        # edits, so it is patched in memory but never saved from here
         tgt_path = os.path.join(LEVEL_DIR, f'level{tgt_ix}.json')
-        tgt = LevelDoc(tgt_ix)
-        tgt.grid[ty][tx] = T_STAIRS_U
-        tgt.stairs_up = (tx, ty)
-        tgt.save()
+        tgt = self._doc_cache.get(tgt_ix)
+        data = load_json(tgt_path, None)
+        grid = data.get('grid') if isinstance(data, dict) else None
+        on_disk = isinstance(grid, list) and 0 <= ty < len(grid) and isinstance(grid[ty], list) and 0 <= tx < len(grid[ty])
+        fresh = None if on_disk else LevelDoc(tgt_ix)
+        if (fresh is not None and not (0 <= tx < fresh.w and 0 <= ty < fresh.h)) or \
+                (tgt is not None and not (0 <= tx < tgt.w and 0 <= ty < tgt.h)):
+            self.status = f'Position {tx},{ty} is outside level {tgt_ix}'
+            return
+        if on_disk:
+            # Patch the one cell in place instead of a full LevelDoc load/save round trip
+            grid[ty][tx] = T_STAIRS_U
+            data['stairs_up'] = [tx, ty]
+            save_json(tgt_path, data)
+        else:
+            # Missing, packed or too-small file: rewrite it from its on-disk state
+            fresh.grid[ty][tx] = T_STAIRS_U
+            fresh.stairs_up = (tx, ty)
+            fresh.save()
+        if tgt is not None:
+            tgt.grid[ty][tx] = T_STAIRS_U
+            tgt.stairs_up = (tx, ty)
         # Set current stairs down and save
         self.doc.grid[y][x] = T_STAIRS_D
         self.doc.stairs_down = (x, y)
+        self._grid_dirty = True
+        self.tile_dirty(x, y)
         self.doc.save()
         self.status = f'Linked down to level {tgt_ix} at {tx},{ty}'
 
-    def draw(self):
+    def _rebuild_layout(self):
+        # Per-tile rects in grid-surface coordinates (offset by MARGIN on screen)
+        w, h = self.doc.w, self.doc.h
+        self._tile_rects = [[pygame.Rect(x*TILE, y*TILE, TILE-1, TILE-1) for x in range(w)] for y in range(h)]
+        # Same rects in row-major order, lined up with b''.join(grid)
+        self._flat_rects = [r for rects in self._tile_rects for r in rects]
+        self._layout_size = (w, h)
+        self._grid_dirty = True
+        if not self._tile_atlas:
+            self._tile_atlas = self.make_tile_atlas()
+            self._tool_icons = {t: s.convert_alpha() for t, s in self.make_icons(28, 28, 6, 8, False).items()}
+            self._blank_tile = pygame.Surface((TILE-1, TILE-1)).convert()
+            self._blank_tile.fill(BG)
+        # Empty floor for every cell, gaps included; render_grid starts from a copy of this
+        floor = self._floor_layer = pygame.Surface((w*TILE, h*TILE)).convert()
+        floor.fill(BG)
+        empty = self._tile_atlas[T_EMPTY]
+        floor.blits([(empty, r) for r in self._flat_rects], False)
+        # Palette buttons and labels only move when the grid width changes
+        px = self._palette_x = MARGIN + w*TILE + 20
+        py = MARGIN + 22
+        small = lambda s, pos: (self.render_text(self.font_small, s, WHITE), pos)
+        labels = []
+        self.btn_file_rect = pygame.Rect(px, py, 80, 22)
+        labels.append(small('File', (px+8, py+4)))
+        self.btn_enc_rect = pygame.Rect(px+90, py, 120, 22)
+        labels.append(small('Encounters', (px+98, py+4)))
+        py += 30
+        self.btn_gen_rect = pygame.Rect(px, py, 120, 22)
+        labels.append(small('Generate', (px+8, py+4)))
+        py += 30
+        for line in ('S: Save   ,/.: Prev/Next level', '0..6: Select tool   R: Reset', 'Right-click stairs-down: link'):
+            labels.append(small(line, (px, py))); py += 18
+        py += 6
+        self.tool_rects = []
+        for tid, label in TOOLS:
+            self.tool_rects.append((pygame.Rect(px, py, 28, 28), tid))
+            labels.append(small(label, (px+36, py+7)))
+            py += 36
+        self._palette_labels = labels
+        # Modal boxes are centred in the window, so they also only move with the level size
+        center = pygame.Rect((0, 0), self.window_dims()).center
+        self._menu_boxes = {}
+        for name, size in (('file', (360, 220)), ('enc', (420, 380)), ('gen', (360, 180)), ('input', (480, 120))):
+            box = self._menu_boxes[name] = pygame.Rect((0, 0), size)
+            box.center = center
+        self._input_box = self._menu_boxes.pop('input')
+        # Input box plus room for six suggestion rows, clipped to the window
+        self._input_area = pygame.Rect(self._input_box.topleft, (480, 84 + 6*24)).clip(pygame.Rect((0, 0), self.window_dims()))
+
+    @classmethod
+    def make_tile_atlas(cls) -> Dict[int, pygame.Surface]:
+        icons = cls.make_icons(TILE-1, TILE-1, 3, max(3, TILE//4), True)
+        atlas = {}
+        for t in (T_WALL,) + FLOOR_TILES:
+            s = pygame.Surface((TILE-1, TILE-1))
+            s.fill(GRAY if t == T_WALL else FLOOR)
+            if t in icons:
+                s.blit(icons[t], (0, 0))
+            atlas[t] = s.convert()
+        return atlas
+
+    @staticmethod
+    def make_icons(w, h, pad, radius, grid):
+        # grid=True: map markers (incl. locked door); False: palette samples (incl. wall)
+        icons = {}
+        def icon():
+            return pygame.Surface((w, h), pygame.SRCALPHA)
+        r = pygame.Rect(0, 0, w, h)
+        if grid:
+            s = icons[T_LOCKED] = icon()
+            bar = r.inflate(-2, -TILE//2)
+            bar.centery = r.centery
+            pygame.draw.rect(s, (36, 28, 22), bar)
+            pygame.draw.rect(s, (120, 100, 60), bar, 1)
+            lock = pygame.Rect(0,0, 8,8)
+            lock.center = (r.centerx, r.centery)
+            pygame.draw.rect(s, (200,180,90), lock, 1)
+        else:
+            pygame.draw.rect(icons.setdefault(T_WALL, icon()), GRAY, r.inflate(-6,-6))
+        pygame.draw.circle(icons.setdefault(T_TOWN, icon()), BLUE, r.center, radius)
+        pygame.draw.polygon(icons.setdefault(T_STAIRS_D, icon()), YELLOW, [(r.left+pad, r.top+pad), (r.right-pad, r.top+pad), (r.centerx, r.bottom-pad)])
+        pygame.draw.polygon(icons.setdefault(T_STAIRS_U, icon()), GREEN, [(r.left+pad, r.bottom-pad), (r.right-pad, r.bottom-pad), (r.centerx, r.top+pad)])
+        return icons
+
+    def render_grid(self):
+        # Tiles are cached on their own surface and only repainted when the grid changes.
+        # Every known tile is one atlas image, so the whole grid goes out in a single blits() call
+        surf = self._grid_cache
+        size = (self.doc.w*TILE, self.doc.h*TILE)
+        if surf is None or surf.get_size() != size:
+            surf = self._grid_cache = pygame.Surface(size).convert()
+        # Start from the prebuilt floor layer and draw only the non-empty cells over it
+        surf.blit(self._floor_layer, (0, 0))
+        atlas, blank = self._tile_atlas, self._blank_tile
+        # The grid joined into one bytes object walks in step with the flat rect list: one zip, no nesting
+        surf.blits([(atlas.get(t, blank), r) for t, r in zip(b''.join(self.doc.grid), self._flat_rects)
+                    if t != T_EMPTY], False)
+        self._grid_src = self.doc.grid
+        self._grid_dirty = False
+
+    def draw_base(self):
         self.screen.fill(BG)
         # Grid
         ox, oy = MARGIN, MARGIN
-        grid_w, grid_h = (W * TILE, H * TILE)
-        for y in range(H):
-            for x in range(W):
-                r = pygame.Rect(ox + x*TILE, oy + y*TILE, TILE-1, TILE-1)
-                t = self.doc.grid[y][x]
-                if t == T_WALL:
-                    pygame.draw.rect(self.screen, GRAY, r)
-                elif t == T_EMPTY:
-                    pygame.draw.rect(self.screen, (30,30,34), r)
-                elif t == T_TOWN:
-                    pygame.draw.rect(self.screen, (30,30,34), r)
-                    pygame.draw.circle(self.screen, BLUE, r.center, max(3, TILE//4))
-                elif t == T_STAIRS_D:
-                    pygame.draw.rect(self.screen, (30,30,34), r)
-                    pygame.draw.polygon(self.screen, YELLOW, [(r.left+3, r.top+3), (r.right-3, r.top+3), (r.centerx, r.bottom-3)])
-                elif t == T_STAIRS_U:
-                    pygame.draw.rect(self.screen, (30,30,34), r)
-                    pygame.draw.polygon(self.screen, GREEN, [(r.left+3, r.bottom-3), (r.right-3, r.bottom-3), (r.centerx, r.top+3)])
-                elif t == T_LOCKED:
-                    pygame.draw.rect(self.screen, (30,30,34), r)
-                    # draw door bar
-                    bar = r.inflate(-2, -TILE//2)
-                    bar.centery = r.centery
-                    pygame.draw.rect(self.screen, (36, 28, 22), bar)
-                    pygame.draw.rect(self.screen, (120, 100, 60), bar, 1)
-                    # small lock
-                    lock = pygame.Rect(0,0, 8,8)
-                    lock.center = (r.centerx, r.centery)
-                    pygame.draw.rect(self.screen, (200,180,90), lock, 1)
+        w, h = self.doc.w, self.doc.h
+        grid_w, grid_h = (w * TILE, h * TILE)
+        if self._layout_size != (w, h):
+            self._rebuild_layout()
+        if self._grid_dirty or self._grid_src is not self.doc.grid:
+            self.render_grid()
+        self.screen.blit(self._grid_cache, (ox, oy))
         # Draw chests as overlays
         for c in self.doc.chests:
             x, y = int(c.get('x', -1)), int(c.get('y', -1))
-            if 0 <= x < W and 0 <= y < H:
-                r = pygame.Rect(ox + x*TILE, oy + y*TILE, TILE-1, TILE-1)
-                cr = r.inflate(-8, -10)
-                cr.y = r.y + (TILE//2)
+            if 0 <= x < w and 0 <= y < h:
+                # Lower half of the tile, inset 4px each side; reuses one scratch rect
+                cr = self._scratch_rect
+                cr.update(ox + x*TILE + 4, oy + y*TILE + TILE//2, TILE-9, TILE-11)
                 pygame.draw.rect(self.screen, (140, 100, 40), cr)
                 pygame.draw.rect(self.screen, (90, 70, 30), cr, 1)
         # Grid border
         pygame.draw.rect(self.screen, YELLOW, (ox-1, oy-1, grid_w+2, grid_h+2), 1)
 
-        # Palette
-        px = MARGIN + grid_w + 20
-        py = MARGIN
-        self.text(f'Level {self.doc.index}', (px, py), YELLOW); py += 22
-        # Buttons for File and Encounters
-        self.btn_file_rect = pygame.Rect(px, py, 80, 22)
-        pygame.draw.rect(self.screen, (40,40,48), self.btn_file_rect)
-        pygame.draw.rect(self.screen, YELLOW, self.btn_file_rect, 1)
-        self.text_small('File', (px+8, py+4))
-        self.btn_enc_rect = pygame.Rect(px+90, py, 120, 22)
-        pygame.draw.rect(self.screen, (40,40,48), self.btn_enc_rect)
-        pygame.draw.rect(self.screen, YELLOW, self.btn_enc_rect, 1)
-        self.text_small('Encounters', (px+98, py+4))
-        py += 30
-        self.btn_gen_rect = pygame.Rect(px, py, 120, 22)
-        pygame.draw.rect(self.screen, (40,40,48), self.btn_gen_rect)
-        pygame.draw.rect(self.screen, YELLOW, self.btn_gen_rect, 1)
-        self.text_small('Generate', (px+8, py+4))
-        py += 30
-        self.text_small('S: Save   ,/.: Prev/Next level', (px, py)); py += 18
-        self.text_small('0..6: Select tool   R: Reset', (px, py)); py += 18
-        self.text_small('Right-click stairs-down: link', (px, py)); py += 18
-        py += 6
-        tools = [
-            (T_EMPTY, 'Empty'),
-            (T_WALL, 'Wall'),
-            (T_TOWN, 'Town (L0)'),
-            (T_STAIRS_D, 'Stairs Down'),
-            (T_STAIRS_U, 'Stairs Up'),
-            (T_LOCKED, 'Locked Door'),
-            (TOOL_CHEST, 'Chest'),
-        ]
-        self.tool_rects = []
-        for tid, label in tools:
-            r = pygame.Rect(px, py, 28, 28)
+        # Palette (geometry and static labels come from _rebuild_layout)
+        px = self._palette_x
+        self.text(f'Level {self.doc.index}', (px, MARGIN), YELLOW)
+        for r in (self.btn_file_rect, self.btn_enc_rect, self.btn_gen_rect):
+            pygame.draw.rect(self.screen, (40,40,48), r)
+            pygame.draw.rect(self.screen, YELLOW, r, 1)
+        for r, tid in self.tool_rects:
             color = (60,60,80) if self.tool != tid else (100,100,120)
             pygame.draw.rect(self.screen, color, r)
             pygame.draw.rect(self.screen, YELLOW if self.tool==tid else WHITE, r, 1)
-            self.text_small(label, (px+36, py+7))
             # sample tile icon
-            if tid == T_WALL:
-                pygame.draw.rect(self.screen, GRAY, r.inflate(-6,-6))
-            elif tid == T_TOWN:
-                pygame.draw.circle(self.screen, BLUE, r.center, 8)
-            elif tid == T_STAIRS_D:
-                pygame.draw.polygon(self.screen, YELLOW, [(r.left+6, r.top+6), (r.right-6, r.top+6), (r.centerx, r.bottom-6)])
-            elif tid == T_STAIRS_U:
-                pygame.draw.polygon(self.screen, GREEN, [(r.left+6, r.bottom-6), (r.right-6, r.bottom-6), (r.centerx, r.top+6)])
-            self.tool_rects.append((r, tid))
-            py += 36
+            icon = self._tool_icons.get(tid)
+            if icon is not None:
+                self.screen.blit(icon, r)
+        self.screen.blits(self._palette_labels, False)
 
         # Status
-        win_w, win_h = window_dims()
+        win_w, win_h = self.window_dims()
         self.text_small(self.status, (px, win_h - 22), YELLOW)
 
+    def draw(self):
+        win_w, win_h = self.window_dims()
+        if self.input_active or self.file_menu or self.enc_menu or self.gen_menu:
+            # Nothing under a modal overlay can change while it is open, so the dimmed
+            # base layer is rendered once and reused until its inputs change.
+            key = self._under_state()
+            if key != self._under_key or self._grid_dirty:
+                self.draw_base()
+                self.screen.blit(self.dim_overlay(), (0, 0))
+                self._under = self.screen.copy()
+                self._under_key = key
+            else:
+                self.screen.blit(self._under, (0, 0))
+        else:
+            self._under_key = None
+            self.draw_base()
+
         # Input popup
         if self.input_active:
-            overlay = pygame.Surface(window_dims(), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, 160))
-            self.screen.blit(overlay, (0, 0))
-            box_w, box_h = 480, 120
-            rx = win_w//2 - box_w//2; ry = win_h//2 - box_h//2
-            rect = pygame.Rect(rx, ry, box_w, box_h)
-            pygame.draw.rect(self.screen, (20,20,26), rect)
-            pygame.draw.rect(self.screen, YELLOW, rect, 2)
-            self.text(self.input_prompt, (rx+16, ry+18))
-            self.text(self.input_text + '_', (rx+16, ry+58), YELLOW)
-            # If in suggestion modes, show suggestions below
-            if self.input_mode in ('monster','item') and self.input_suggestions:
-                sy = ry + 84
-                self.suggestion_rects = []
-                for i, (_id, disp) in enumerate(self.input_suggestions[:6]):
-                    r = pygame.Rect(rx+16, sy, box_w-32, 22)
-                    sel = (i == self.suggestion_index)
-                    pygame.draw.rect(self.screen, (60,60,80) if sel else (40,40,48), r)
-                    pygame.draw.rect(self.screen, YELLOW if sel else WHITE, r, 1)
-                    self.text_small(disp, (r.x+8, r.y+4), YELLOW if sel else WHITE)
-                    self.suggestion_rects.append(r)
-                    sy += 24
+            self.draw_input_popup()
 
         # File menu overlay
         if self.file_menu and not self.input_active:
-            overlay = pygame.Surface(window_dims(), pygame.SRCALPHA)
-            overlay.fill((0,0,0,160)); self.screen.blit(overlay,(0,0))
-            box = pygame.Rect(0,0,360,220); win_w,win_h = window_dims(); box.center=(win_w//2, win_h//2)
-            pygame.draw.rect(self.screen, (20,20,26), box); pygame.draw.rect(self.screen, YELLOW, box, 2)
-            x,y=box.x+16, box.y+16
-            self.text('File', (x,y), YELLOW); y+=28
-            opts=[('New (clear)','new'), ('Open level...','open'), ('Save','save'), ('Save As...','saveas'), ('Set level size...','size'), ('Close','close')]
-            self.file_opt_rects=[]
-            for label,_id in opts:
-                r=pygame.Rect(x,y, box.w-32, 26)
-                pygame.draw.rect(self.screen, (40,40,48), r); pygame.draw.rect(self.screen, WHITE, r,1)
-                self.text_small(label, (r.x+8,r.y+6))
-                self.file_opt_rects.append((r,_id)); y+=32
+            box = self._menu_boxes['file']
+            if not self._cached_panel('file', box, None):
+                pygame.draw.rect(self.screen, (20,20,26), box); pygame.draw.rect(self.screen, YELLOW, box, 2)
+                x,y=box.x+16, box.y+16
+                self.text('File', (x,y), YELLOW); y+=28
+                opts=[('New (clear)','new'), ('Open level...','open'), ('Save','save'), ('Save As...','saveas'), ('Set level size...','size'), ('Close','close')]
+                self.file_opt_rects=[]
+                for label,_id in opts:
+                    r=pygame.Rect(x,y, box.w-32, 26)
+                    pygame.draw.rect(self.screen, (40,40,48), r); pygame.draw.rect(self.screen, WHITE, r,1)
+                    self.text_small(label, (r.x+8,r.y+6))
+                    self.file_opt_rects.append((r,_id)); y+=32
+                self._store_panel('file', box, None, [r for r, _ in self.file_opt_rects])
 
         # Encounters overlay
         if self.enc_menu and not self.input_active:
-            overlay = pygame.Surface(window_dims(), pygame.SRCALPHA)
-            overlay.fill((0,0,0,160)); self.screen.blit(overlay,(0,0))
-            box = pygame.Rect(0,0,420,380); win_w,win_h = window_dims(); box.center=(win_w//2, win_h//2)
-            pygame.draw.rect(self.screen, (20,20,26), box); pygame.draw.rect(self.screen, YELLOW, box, 2)
-            x,y=box.x+16, box.y+16
-            self.text('Encounters', (x,y), YELLOW); y+=26
-            # Only list monsters currently available on the level
-            curr = self.doc.encounters.get('monsters', [])
-            id_to_name = {m.get('id'): m.get('name') for m in self.monsters if isinstance(m, dict)}
-            self.enc_opt_rects=[]
-            self.text_small('Available monsters on this level:', (x, y), WHITE); y += 20
-            for mid in curr:
-                r=pygame.Rect(x,y, box.w-32, 22)
-                pygame.draw.rect(self.screen, (60,60,72), r); pygame.draw.rect(self.screen, WHITE, r,1)
-                name = id_to_name.get(mid, mid)
-                self.text_small(f"{mid} - {name} (click to remove)", (r.x+8,r.y+4), YELLOW)
-                self.enc_opt_rects.append((r, mid)); y+=24
-                if y> box.bottom-140: break
-            y=box.bottom-100
-            g=self.doc.encounters.get('group',[1,3])
-            self.text_small(f"Group min: {g[0]}  max: {g[1]}", (x,y), WHITE); y+=24
-            btns=[('Min -','min-'),('Min +','min+'),('Max -','max-'),('Max +','max+'),('Add...','add'),('Close','close')]
-            self.enc_btn_rects=[]
-            bx=x
-            for label,_id in btns:
-                r=pygame.Rect(bx,y, 74,24)
-                pygame.draw.rect(self.screen,(40,40,48), r); pygame.draw.rect(self.screen, WHITE, r,1)
-                self.text_small(label,(r.x+6,r.y+4)); self.enc_btn_rects.append((r,_id)); bx+= 78
+            box = self._menu_boxes['enc']
+            panel_key = (tuple(self.doc.encounters['monsters']), tuple(self.doc.encounters.get('group',[1,3])))
+            if not self._cached_panel('enc', box, panel_key):
+                pygame.draw.rect(self.screen, (20,20,26), box); pygame.draw.rect(self.screen, YELLOW, box, 2)
+                x,y=box.x+16, box.y+16
+                self.text('Encounters', (x,y), YELLOW); y+=26
+                # Only list monsters currently available on the level
+                curr = self.doc.encounters['monsters']
+                self.enc_opt_rects=[]
+                self.text_small('Available monsters on this level:', (x, y), WHITE); y += 20
+                list_y = y
+                for mid in curr:
+                    self.enc_opt_rects.append((pygame.Rect(x,y, box.w-32, 22), mid)); y+=24
+                    if y> box.bottom-140: break
+                key = tuple(mid for _, mid in self.enc_opt_rects)
+                if key != self._enc_rows_key:
+                    self.render_enc_rows(key, box.w-32)
+                if key:
+                    self.screen.blit(self._enc_rows, (x, list_y))
+                y=box.bottom-100
+                g=self.doc.encounters.get('group',[1,3])
+                self.text_small(f"Group min: {g[0]}  max: {g[1]}", (x,y), WHITE); y+=24
+                btns=[('Min -','min-'),('Min +','min+'),('Max -','max-'),('Max +','max+'),('Add...','add'),('Close','close')]
+                self.enc_btn_rects=[]
+                bx=x
+                for label,_id in btns:
+                    r=pygame.Rect(bx,y, 74,24)
+                    pygame.draw.rect(self.screen,(40,40,48), r); pygame.draw.rect(self.screen, WHITE, r,1)
+                    self.text_small(label,(r.x+6,r.y+4)); self.enc_btn_rects.append((r,_id)); bx+= 78
+                self._store_panel('enc', box, panel_key, [r for r, _ in self.enc_btn_rects])
 
         # Generate menu overlay
         if self.gen_menu and not self.input_active:
-            overlay = pygame.Surface(window_dims(), pygame.SRCALPHA)
-            overlay.fill((0,0,0,160)); self.screen.blit(overlay,(0,0))
-            box = pygame.Rect(0,0,360,180); win_w,win_h = window_dims(); box.center=(win_w//2, win_h//2)
-            pygame.draw.rect(self.screen, (20,20,26), box); pygame.draw.rect(self.screen, YELLOW, box, 2)
-            x,y=box.x+16, box.y+16
-            self.text('Generate', (x,y), YELLOW); y+=28
-            opts=[('Maze','maze'), ('Rooms + halls','rooms'), ('Close','close')]
-            self.gen_opt_rects=[]
-            for label,_id in opts:
-                r=pygame.Rect(x,y, box.w-32, 30)
-                pygame.draw.rect(self.screen, (40,40,48), r); pygame.draw.rect(self.screen, WHITE, r,1)
-                self.text_small(label,(r.x+10,r.y+7)); self.gen_opt_rects.append((r,_id))
-                y+= 36
-
-        pygame.display.flip()
+            box = self._menu_boxes['gen']
+            if not self._cached_panel('gen', box, None):
+                pygame.draw.rect(self.screen, (20,20,26), box); pygame.draw.rect(self.screen, YELLOW, box, 2)
+                x,y=box.x+16, box.y+16
+                self.text('Generate', (x,y), YELLOW); y+=28
+                opts=[('Maze','maze'), ('Rooms + halls','rooms'), ('Close','close')]
+                self.gen_opt_rects=[]
+                for label,_id in opts:
+                    r=pygame.Rect(x,y, box.w-32, 30)
+                    pygame.draw.rect(self.screen, (40,40,48), r); pygame.draw.rect(self.screen, WHITE, r,1)
+                    self.text_small(label,(r.x+10,r.y+7)); self.gen_opt_rects.append((r,_id))
+                    y+= 36
+                self._store_panel('gen', box, None, [r for r, _ in self.gen_opt_rects])
+
+        self.present()
+
+    def present(self):
+        # Everything except edited tiles and the tool highlight is covered by the frame key;
+        # if that is unchanged only the dirty rects differ from what is already on display.
+        key = self._under_state()[:4] + (self.doc.w, self.doc.h, self.file_menu, self.enc_menu, self.gen_menu, self.input_active)
+        partial = key == self._frame_key and not self.input_active and not (self.file_menu or self.enc_menu or self.gen_menu)
+        rects = self._dirty_rects
+        # Past a quarter of the grid area one full flip is cheaper than many small tile updates
+        if partial and len(rects) * TILE * TILE > (self.doc.w * self.doc.h * TILE * TILE) // 4:
+            partial = False
+        if partial and self.tool != self._frame_tool:
+            win_w, win_h = self.window_dims()
+            px = MARGIN + self.doc.w*TILE + 2
+            rects.append(pygame.Rect(px, 0, win_w - px, win_h))
+        if not partial:
+            pygame.display.flip()
+        elif rects:
+            pygame.display.update(rects)
+        self._dirty_rects.clear()
+        self._frame_key = key
+        self._frame_tool = self.tool
+
+    def dim_overlay(self) -> pygame.Surface:
+        # Translucent black layer behind modal UI; reallocated only when the window size changes
+        if self._overlay_surf is None or self._overlay_surf.get_size() != self.window_dims():
+            self._overlay_surf = pygame.Surface(self.window_dims(), pygame.SRCALPHA).convert_alpha()
+            self._overlay_surf.fill((0, 0, 0, 160))
+        return self._overlay_surf
+
+    def _under_state(self) -> tuple:
+        return (id(self.doc), id(self.doc.grid), self.doc.index, self.status, self.tool, self.doc.w, self.doc.h)
+
+    def draw_input_popup(self):
+        rect = self._input_box
+        rx, ry, box_w = rect.x, rect.y, rect.w
+        pygame.draw.rect(self.screen, (20,20,26), rect)
+        pygame.draw.rect(self.screen, YELLOW, rect, 2)
+        self.text(self.input_prompt, (rx+16, ry+18))
+        # The typed line changes every keystroke; render it directly so it does not churn the label cache
+        self.screen.blit(self.font.render(self.input_text + '_', True, YELLOW), (rx+16, ry+58))
+        # If in suggestion modes, show suggestions below
+        if self.input_mode in ('monster','item') and self.input_suggestions:
+            sy = ry + 84
+            self.suggestion_rects = []
+            for i, (_id, disp) in enumerate(self.input_suggestions[:6]):
+                r = pygame.Rect(rx+16, sy, box_w-32, 22)
+                sel = (i == self.suggestion_index)
+                pygame.draw.rect(self.screen, (60,60,80) if sel else (40,40,48), r)
+                pygame.draw.rect(self.screen, YELLOW if sel else WHITE, r, 1)
+                self.text_small(disp, (r.x+8, r.y+4), YELLOW if sel else WHITE)
+                self.suggestion_rects.append(r)
+                sy += 24
+
+    def redraw_input(self):
+        # Per keystroke only the popup changes: restore its area from the dimmed
+        # snapshot, repaint it and push just that rect to the display.
+        if self._under_key != self._under_state() or self._grid_dirty:
+            self.draw()
+            return
+        area = self._input_area
+        self.screen.blit(self._under, area, area)
+        self.draw_input_popup()
+        pygame.display.update(area)
+
+    def _cached_panel(self, name, box, key) -> bool:
+        # Blit a menu panel drawn on an earlier frame; False means the caller has to draw it
+        hit = self._panels.get(name)
+        if hit is not None and hit[0] == (key, tuple(box)):
+            self.screen.blit(hit[2], hit[1])
+            return True
+        return False
+
+    def _store_panel(self, name, box, key, rects=()):
+        # rects: controls that may stick out past the box edge
+        area = box.unionall(list(rects)).clip(self.screen.get_rect())
+        self._panels[name] = ((key, tuple(box)), area, self.screen.subsurface(area).copy())
+
+    def render_enc_rows(self, mids, w):
+        # All rows go on one surface so an open Encounters menu costs a single blit per frame
+        id_to_name = {m.get('id'): m.get('name') for m in self.monsters if isinstance(m, dict)}
+        surf = self._enc_rows = pygame.Surface((w, max(1, 24*len(mids))), pygame.SRCALPHA).convert_alpha()
+        for i, mid in enumerate(mids):
+            r = pygame.Rect(0, i*24, w, 22)
+            pygame.draw.rect(surf, (60,60,72), r); pygame.draw.rect(surf, WHITE, r,1)
+            name = id_to_name.get(mid, mid)
+            surf.blit(self.render_text(self.font_small, f"{mid} - {name} (click to remove)", YELLOW), (r.x+8,r.y+4))
+        self._enc_rows_key = mids
+
+    def render_text(self, font, s, color):
+        # Labels repeat frame to frame; rasterize each (font, text, color) once
+        key = (id(font), s, color)
+        surf = self._text_cache.get(key)
+        if surf is None:
+            if len(self._text_cache) >= TEXT_CACHE_MAX:
+                del self._text_cache[next(iter(self._text_cache))]
+            surf = self._text_cache[key] = font.render(s, True, color).convert_alpha()
+        return surf
 
     def text(self, s, pos, color=WHITE):
-        self.screen.blit(self.font.render(s, True, color), pos)
+        self.screen.blit(self.render_text(self.font, s, color), pos)
 
     def text_small(self, s, pos, color=WHITE):
-        self.screen.blit(self.font_small.render(s, True, color), pos)
+        self.screen.blit(self.render_text(self.font_small, s, color), pos)
 
+    @_text_input
     def read_blocking_input(self) -> Optional[str]:
         # Runs a small loop to collect text input into self.input_text
+        self.draw()
         while self.input_active:
-            for event in pygame.event.get():
+            changed = False
+            for event in [pygame.event.wait()] + pygame.event.get():
                 if event.type == pygame.QUIT:
                     pygame.quit(); sys.exit(0)
-                if event.type == pygame.KEYDOWN:
+                if event.type == pygame.TEXTINPUT:
+                    text = _printable(event.text)
+                    if text:
+                        self.input_text += text; changed = True
+                elif event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:
                         self.input_active = False
                         return None
@@ -435,12 +778,9 @@ class Editor:
                         self.input_active = False
                         return self.input_text.strip()
                     elif event.key == pygame.K_BACKSPACE:
-                        self.input_text = self.input_text[:-1]
-                    else:
-                        ch = event.unicode
-                        if ch and ch.isprintable():
-                            self.input_text += ch
-            self.draw()
+                        self.input_text = self.input_text[:-1]; changed = True
+            if changed:
+                self.redraw_input()
         return None
 
     def handle_add_monster(self):
@@ -456,12 +796,12 @@ class Editor:
                 else:
                     self.status = 'Unknown or ambiguous monster id'
                     return
-            mons = self.doc.encounters.get('monsters', [])
+            mons = self.doc.encounters['monsters']
             if mid not in mons:
-                mons.append(mid)
-                self.doc.encounters['monsters'] = mons
+                mons[mid] = None
                 self.status = f'Added monster {mid}'
 
+    @_text_input
     def read_monster_id_input(self) -> Optional[str]:
         # Prompt user with tab-completion and selection list
         self.input_active = True
@@ -482,10 +822,20 @@ class Editor:
             id_to_name = {m.get('id'): m.get('name') for m in self.monsters if isinstance(m, dict)}
             return [(i, f"{i} - {id_to_name.get(i, '')}") for i in matches]
 
+        # Sleep until the next event instead of spinning; draw once up front
+        self.draw()
         while self.input_active:
-            for event in pygame.event.get():
+            for event in [pygame.event.wait()] + pygame.event.get():
                 if event.type == pygame.QUIT:
                     pygame.quit(); sys.exit(0)
+                if event.type == pygame.TEXTINPUT:
+                    text = _printable(event.text)
+                    if text:
+                        self.input_text += text
+                        # Refresh suggestions for the new prefix
+                        if self.input_mode == 'monster':
+                            self.input_suggestions = find_matches(self.input_text)
+                            self.suggestion_index = 0 if self.input_suggestions else -1
                 if event.type == pygame.MOUSEBUTTONDOWN:
                     if self.input_mode == 'monster' and self.input_suggestions and event.button == 1:
                         mx, my = event.pos
@@ -535,17 +885,11 @@ class Editor:
                                 self.suggestion_index = (self.suggestion_index - 1) % len(self.input_suggestions)
                             else:
                                 self.suggestion_index = (self.suggestion_index + 1) % len(self.input_suggestions)
-                    else:
-                        ch = event.unicode
-                        if ch and ch.isprintable():
-                            self.input_text += ch
-                            # If suggestions are currently shown, refresh them
-                            if self.input_mode == 'monster':
-                                self.input_suggestions = find_matches(self.input_text)
-                                self.suggestion_index = 0 if self.input_suggestions else -1
-            self.draw()
+            # Only the popup and its suggestion list change here; repaint just that area
+            self.redraw_input()
         return None
 
+    @_text_input
     def read_item_id_input(self) -> Optional[str]:
         # Prompt user to enter an item id with suggestions
         self.input_active = True
@@ -565,10 +909,20 @@ class Editor:
             id_to_name = {it.get('id'): it.get('name') for it in self.items if isinstance(it, dict)}
             return [(i, f"{i} - {id_to_name.get(i, '')}") for i in matches]
 
+        # Sleep until the next event instead of spinning; draw once up front
+        self.draw()
         while self.input_active:
-            for event in pygame.event.get():
+            for event in [pygame.event.wait()] + pygame.event.get():
                 if event.type == pygame.QUIT:
                     pygame.quit(); sys.exit(0)
+                if event.type == pygame.TEXTINPUT:
+                    text = _printable(event.text)
+                    if text:
+                        self.input_text += text
+                        # Refresh suggestions for the new prefix
+                        if self.input_mode == 'item':
+                            self.input_suggestions = find_item_matches(self.input_text)
+                            self.suggestion_index = 0 if self.input_suggestions else -1
                 if event.type == pygame.MOUSEBUTTONDOWN:
                     if self.input_mode == 'item' and self.input_suggestions and event.button == 1:
                         mx, my = event.pos
@@ -616,20 +970,20 @@ class Editor:
                                 self.suggestion_index = (self.suggestion_index - 1) % len(self.input_suggestions)
                             else:
                                 self.suggestion_index = (self.suggestion_index + 1) % len(self.input_suggestions)
-                    else:
-                        ch = event.unicode
-                        if ch and ch.isprintable():
-                            self.input_text += ch
-                            if self.input_mode == 'item':
-                                self.input_suggestions = find_item_matches(self.input_text)
-                                self.suggestion_index = 0 if self.input_suggestions else -1
-            self.draw()
+            # Only the popup and its suggestion list change here; repaint just that area
+            self.redraw_input()
         return None
 
     def run(self):
-        clock = pygame.time.Clock()
+        # Event-driven: sleep until input arrives and only repaint when something may have changed
+        self._dirty = True
         while self.running:
-            for event in pygame.event.get():
+            if self._dirty:
+                self.draw()
+                self._dirty = False
+            for event in [pygame.event.wait()] + pygame.event.get():
+                if event.type != pygame.MOUSEMOTION:
+                    self._dirty = True
                 if event.type == pygame.QUIT:
                     self.running = False
                 elif event.type == pygame.MOUSEBUTTONDOWN and not self.input_active:
@@ -639,15 +993,15 @@ class Editor:
                         for r,_id in self.file_opt_rects:
                             if r.collidepoint(mx,my):
                                 if _id=='new':
-                                    self.doc.grid = base_grid(); self.doc.stairs_down=self.doc.stairs_up=None
+                                    self.doc.grid = base_grid(self.doc.w, self.doc.h); self.doc.stairs_down=self.doc.stairs_up=None
                                     if self.doc.index==0: self.doc.town_portal=(2,2)
                                     self.file_menu=False
                                 elif _id=='open':
                                     self.prompt_input('Open level index:'); s=self.read_blocking_input()
                                     if s is not None:
                                         try:
-                                            self.doc = LevelDoc(int(s))
-                                            self.screen = pygame.display.set_mode(window_dims())
+                                            self.doc = self._get_doc(int(s))
+                                            self._sync_window()
                                         except: pass
                                     self.file_menu=False
                                 elif _id=='save':
@@ -656,7 +1010,9 @@ class Editor:
                                     self.prompt_input('Save as level index:'); s=self.read_blocking_input()
                                     if s is not None:
                                         try:
-                                            ni=int(s); self.doc.index=ni; self.doc.path=os.path.join(LEVEL_DIR,f'level{ni}.json'); self.doc.save()
+                                            ni=int(s); self._doc_cache.pop(self.doc.index, None)
+                                            self.doc.index=ni; self.doc.path=os.path.join(LEVEL_DIR,f'level{ni}.json'); self.doc.save()
+                                            self._doc_cache[ni]=self.doc
                                         except: pass
                                     self.file_menu=False
                                 elif _id=='size':
@@ -665,16 +1021,13 @@ class Editor:
                                         try:
                                             nw,nh=map(int,s.replace(' ','').split(','))
                                             nw=max(8,min(64,nw)); nh=max(8,min(64,nh))
-                                            global W,H
-                                            W, H = nw, nh
+                                            self.doc.w, self.doc.h = nw, nh
                                             # resize grid preserving content
-                                            newg=[[T_WALL]*W for _ in range(H)]
-                                            oy=len(self.doc.grid); ox=len(self.doc.grid[0]) if self.doc.grid else 0
-                                            for y in range(min(H,oy)):
-                                                for x in range(min(W,ox)):
-                                                    newg[y][x]=self.doc.grid[y][x]
+                                            newg=wall_grid(nw, nh)
+                                            for row, src in zip(newg, self.doc.grid):
+                                                n=min(nw, len(src)); row[:n]=src[:n]
                                             self.doc.grid=newg
-                                            self.screen = pygame.display.set_mode(window_dims())
+                                            self._sync_window()
                                         except: pass
                                     self.file_menu=False
                                 elif _id=='close':
@@ -698,10 +1051,7 @@ class Editor:
                     if self.enc_menu:
                         for r, mid in self.enc_opt_rects:
                             if r.collidepoint(mx,my):
-                                mons=self.doc.encounters.get('monsters', [])
-                                if mid in mons:
-                                    mons.remove(mid)
-                                self.doc.encounters['monsters']=mons
+                                self.doc.encounters['monsters'].pop(mid, None)
                                 break
                         for r,_id in self.enc_btn_rects:
                             if r.collidepoint(mx,my):
@@ -730,7 +1080,7 @@ class Editor:
                         hit_tool=False
                         for r,tid in self.tool_rects:
                             if r.collidepoint(mx,my):
-                                self.tool = tid; hit_tool=True; break
+                                self.tool = tid; self._last_paint = None; hit_tool=True; break
                         if not hit_tool:
                             gp = self.grid_pos_from_mouse(mx, my)
                             if event.button == 1:
@@ -743,8 +1093,13 @@ class Editor:
                                             self.doc.chests.pop(found)
                                         else:
                                             self.doc.chests.append({'x': x, 'y': y, 'iid': 'potion_small'})
+                                        self.tile_dirty(x, y)
                                     else:
                                         self.set_tile(x, y, self.tool)
+                                        # Markers are single cells; only plain tiles paint on drag
+                                        if not _is_marker(self.tool):
+                                            self._last_paint = gp
+                                            self._paint_tool = self.tool
                             elif event.button == 3:
                                 if gp:
                                     x, y = gp
@@ -757,11 +1112,15 @@ class Editor:
                                             iid = self.read_item_id_input()
                                             if iid:
                                                 self.doc.chests[idx]['iid'] = iid
+                elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+                    self._last_paint = None
+                elif event.type == pygame.MOUSEMOTION and event.buttons[0] and self._last_paint and not self.input_active and not (self.file_menu or self.enc_menu or self.gen_menu):
+                    self.paint_drag(event.pos)
                 elif event.type == pygame.KEYDOWN and not self.input_active:
                     if event.key == pygame.K_s:
                         self.doc.save(); self.status = f'Saved level {self.doc.index}'
                     elif event.key == pygame.K_r:
-                        self.doc.grid = base_grid(); self.doc.stairs_down = self.doc.stairs_up = None
+                        self.doc.grid = base_grid(self.doc.w, self.doc.h); self.doc.stairs_down = self.doc.stairs_up = None
                         if self.doc.index == 0: self.doc.town_portal = (2, 2)
                     elif event.key == pygame.K_g:
                         self.gen_menu=True; self.file_menu=False; self.enc_menu=False
@@ -770,36 +1129,50 @@ class Editor:
                     elif event.key == pygame.K_n:
                         generate_rooms_level(self)
                     elif event.key in (pygame.K_COMMA,):
-                        self.doc = LevelDoc(max(0, self.doc.index - 1))
+                        self.doc = self._get_doc(max(0, self.doc.index - 1)); self._sync_window()
                     elif event.key in (pygame.K_PERIOD,):
-                        self.doc = LevelDoc(self.doc.index + 1)
+                        self.doc = self._get_doc(self.doc.index + 1); self._sync_window()
                     elif pygame.K_0 <= event.key <= pygame.K_6:
+                        # A new tool ends any drag in progress; it resumes on the next click
                         self.tool = event.key - pygame.K_0
-
-            self.draw()
-            clock.tick(60)
+                        self._last_paint = None
         pygame.quit()
 
 # ------------------------- Generation helpers -------------------------
 
-def _in_bounds_xy(x: int, y: int) -> bool:
-    return 0 <= x < W and 0 <= y < H
+def _in_bounds_xy(grid: Grid, x: int, y: int) -> bool:
+    return 0 <= y < len(grid) and 0 <= x < len(grid[y])
+
+def _line_cells(x0: int, y0: int, x1: int, y1: int):
+    # Bresenham: grid cells from (x0,y0) to (x1,y1), both ends included
+    dx, dy = abs(x1 - x0), -abs(y1 - y0)
+    sx, sy = (1 if x1 > x0 else -1), (1 if y1 > y0 else -1)
+    err = dx + dy
+    while True:
+        yield x0, y0
+        if x0 == x1 and y0 == y1:
+            return
+        e2 = 2 * err
+        if e2 >= dy:
+            err += dy; x0 += sx
+        if e2 <= dx:
+            err += dx; y0 += sy
 
 def _is_marker(tile: int) -> bool:
-    return tile in (T_TOWN, T_STAIRS_D, T_STAIRS_U)
+    return tile in MARKER_TILES
 
-def _reapply_markers(doc: LevelDoc, grid: List[List[int]]):
+def _reapply_markers(doc: LevelDoc, grid: Grid):
     if doc.town_portal:
         x, y = doc.town_portal
-        if _in_bounds_xy(x, y):
+        if _in_bounds_xy(grid, x, y):
             grid[y][x] = T_TOWN
     if doc.stairs_up:
         x, y = doc.stairs_up
-        if _in_bounds_xy(x, y):
+        if _in_bounds_xy(grid, x, y):
             grid[y][x] = T_STAIRS_U
     if doc.stairs_down:
         x, y = doc.stairs_down
-        if _in_bounds_xy(x, y):
+        if _in_bounds_xy(grid, x, y):
             grid[y][x] = T_STAIRS_D
 
 def _all_markers(doc: LevelDoc) -> List[Tuple[int,int,int]]:
@@ -812,73 +1185,80 @@ def _all_markers(doc: LevelDoc) -> List[Tuple[int,int,int]]:
         x,y = doc.stairs_down; res.append((x,y,T_STAIRS_D))
     return res
 
-def _clamp_center(x: int, y: int) -> Tuple[int,int]:
-    return max(1, min(W-2, x)), max(1, min(H-2, y))
-
-def _neighbors2(x: int, y: int) -> List[Tuple[int,int,int,int]]:
-    dirs = [(2,0),(-2,0),(0,2),(0,-2)]
-    res=[]
-    for dx,dy in dirs:
-        nx,ny=x+dx,y+dy
-        wx,wy=x+dx//2, y+dy//2
-        if 1 <= nx < W-1 and 1 <= ny < H-1:
-            res.append((nx,ny,wx,wy))
-    random.shuffle(res)
-    return res
+def _clamp_center(w: int, h: int, x: int, y: int) -> Tuple[int,int]:
+    return max(1, min(w-2, x)), max(1, min(h-2, y))
 
-def _carve_room(grid: List[List[int]], left: int, top: int, w: int, h: int):
-    for yy in range(top, top+h):
-        for xx in range(left, left+w):
-            if 0 <= xx < W and 0 <= yy < H and not _is_marker(grid[yy][xx]):
-                grid[yy][xx] = T_EMPTY
-
-def _carve_line(grid: List[List[int]], x0: int, y0: int, x1: int, y1: int):
-    x,y=x0,y0
-    dx = 1 if x1> x0 else -1
-    while x != x1:
-        if _in_bounds_xy(x,y) and not _is_marker(grid[y][x]):
-            grid[y][x]=T_EMPTY
-        x += dx
+# Carve lookup: markers map to themselves, every other tile to T_EMPTY. Used with
+# bytes.translate for runs and as grid[y][x] = _CARVE[grid[y][x]] for single cells,
+# which replaces the per-cell 'if not _is_marker(...)' test.
+_CARVE = bytes(t if t in MARKER_TILES else T_EMPTY for t in range(256))
+
+def _carve_span(row: bytearray, x0: int, x1: int):
+    # Carve row[x0:x1] (clamped) in one C-level pass
+    x0 = max(0, x0); x1 = min(len(row), x1)
+    if x0 < x1:
+        row[x0:x1] = row[x0:x1].translate(_CARVE)
+
+def _carve_room(grid: Grid, left: int, top: int, w: int, h: int):
+    for row in grid[max(0, top):max(0, top+h)]:
+        _carve_span(row, left, left+w)
+
+def _carve_line(grid: Grid, x0: int, y0: int, x1: int, y1: int):
+    # Horizontal leg along y0 (x1 excluded), then vertical leg along x1 (y1 excluded), then the end cell
+    if 0 <= y0 < len(grid):
+        if x1 > x0:
+            _carve_span(grid[y0], x0, x1)
+        else:
+            _carve_span(grid[y0], x1+1, x0+1)
+    x,y=x1,y0
     dy = 1 if y1> y0 else -1
     while y != y1:
-        if _in_bounds_xy(x,y) and not _is_marker(grid[y][x]):
-            grid[y][x]=T_EMPTY
+        if _in_bounds_xy(grid,x,y):
+            grid[y][x]=_CARVE[grid[y][x]]
         y += dy
-    if _in_bounds_xy(x,y) and not _is_marker(grid[y][x]):
-        grid[y][x]=T_EMPTY
+    if _in_bounds_xy(grid,x,y):
+        grid[y][x]=_CARVE[grid[y][x]]
+
+_DIRS4 = ((1,0),(-1,0),(0,1),(0,-1))
 
-def _ensure_borders(grid: List[List[int]]):
-    for x in range(W):
-        grid[0][x]=T_WALL; grid[H-1][x]=T_WALL
-    for y in range(H):
-        grid[y][0]=T_WALL; grid[y][W-1]=T_WALL
+def _ensure_borders(grid: Grid):
+    # Top/bottom rows in one slice write each; only the two side columns need a loop
+    w = len(grid[0])
+    grid[0][:] = grid[-1][:] = bytes([T_WALL]) * w
+    for row in grid:
+        row[0] = row[w-1] = T_WALL
 
 def generate_maze_level(self: 'Editor'):
     # Preserve markers by never overwriting those tiles.
-    grid = [[T_WALL for _ in range(W)] for _ in range(H)]
+    gw, gh = self.doc.w, self.doc.h
+    grid = wall_grid(gw, gh)
     _reapply_markers(self.doc, grid)
     # DFS backtracker on odd cells
-    sx = max(1, (W//2)|1)
-    sy = max(1, (H//2)|1)
+    sx = max(1, (gw//2)|1)
+    sy = max(1, (gh//2)|1)
     stack=[(sx,sy)]
-    if not _is_marker(grid[sy][sx]):
-        grid[sy][sx]=T_EMPTY
-    seen={(sx,sy)}
+    grid[sy][sx]=_CARVE[grid[sy][sx]]
+    # Visited flags as one byte per cell (index y*gw+x) instead of a set of tuples.
+    # random.choice over the unvisited neighbours is already uniform, so no shuffle is needed.
+    seen=bytearray(gw*gh); seen[sy*gw+sx]=1
     while stack:
         x,y=stack[-1]
-        nbs=[nb for nb in _neighbors2(x,y) if (nb[0],nb[1]) not in seen]
+        nbs=[(nx,ny) for nx,ny in ((x+2,y),(x-2,y),(x,y+2),(x,y-2))
+             if 1 <= nx < gw-1 and 1 <= ny < gh-1 and not seen[ny*gw+nx]]
         if not nbs:
             stack.pop(); continue
-        nx,ny,wx,wy=random.choice(nbs)
-        if not _is_marker(grid[wy][wx]): grid[wy][wx]=T_EMPTY
-        if not _is_marker(grid[ny][nx]): grid[ny][nx]=T_EMPTY
-        seen.add((nx,ny))
+        nx,ny=random.choice(nbs)
+        wx,wy=(x+nx)//2,(y+ny)//2
+        grid[wy][wx]=_CARVE[grid[wy][wx]]
+        grid[ny][nx]=_CARVE[grid[ny][nx]]
+        seen[ny*gw+nx]=1
         stack.append((nx,ny))
     # Make sure markers have at least one adjacent empty for access
+    # (first in-bounds non-marker neighbour; a frozenset test replaces the _is_marker call)
     for mx,my,_t in _all_markers(self.doc):
-        for dx,dy in [(1,0),(-1,0),(0,1),(0,-1)]:
+        for dx,dy in _DIRS4:
             nx,ny=mx+dx,my+dy
-            if 1<=nx<W-1 and 1<=ny<H-1 and not _is_marker(grid[ny][nx]):
+            if 1<=nx<gw-1 and 1<=ny<gh-1 and grid[ny][nx] not in MARKER_TILES:
                 grid[ny][nx]=T_EMPTY
                 break
     _ensure_borders(grid)
@@ -888,14 +1268,15 @@ def generate_maze_level(self: 'Editor'):
 
 def generate_rooms_level(self: 'Editor'):
     # Start with solid walls and apply markers
-    grid = [[T_WALL for _ in range(W)] for _ in range(H)]
+    gw, gh = self.doc.w, self.doc.h
+    grid = wall_grid(gw, gh)
     _reapply_markers(self.doc, grid)
     # Create a 3x3 centered room for each marker, and center the marker in it
     centers: List[Tuple[int,int]] = []
     rooms: List[Tuple[int,int,int,int]] = []  # (left, top, w, h)
     # First center each marker
     for x,y,t in _all_markers(self.doc):
-        cx,cy=_clamp_center(x,y)
+        cx,cy=_clamp_center(gw,gh,x,y)
         _carve_room(grid, cx-1, cy-1, 3, 3)
         # Move marker to center in doc
         if t==T_TOWN:
@@ -914,11 +1295,11 @@ def generate_rooms_level(self: 'Editor'):
         br=pygame.Rect(bx,by,bw,bh).inflate(pad*2,pad*2)
         return ar.colliderect(br)
     sizes=[(3,3),(6,3),(3,6)]
-    attempts=max(10,(W*H)//16)
+    attempts=max(10,(gw*gh)//16)
     for _ in range(attempts):
         w,h=random.choice(sizes)
-        x=random.randint(1, max(1, W-w-2))
-        y=random.randint(1, max(1, H-h-2))
+        x=random.randint(1, max(1, gw-w-2))
+        y=random.randint(1, max(1, gh-h-2))
         cand=(x,y,w,h)
         if any(overlaps(cand, ex, pad=1) for ex in rooms):
             continue
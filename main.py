@@ -16,20 +16,35 @@ Controls
 Tested with: Python 3.10+, pygame 2.5+
 """
 
+import base64
 import json
 import os
 import random
 import math
-from dataclasses import dataclass, asdict, field
-from typing import List, Optional, Tuple, Dict, Any
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple, Dict, Any
 
 import pygame
 
+# orjson is optional: parses the data/save JSON files much faster than the json module
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _loads(raw: bytes):
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
 # ------------------------------ Constants ----------------------------------
 WIDTH, HEIGHT = 960, 600
 VIEW_H = 440
 LOG_H = HEIGHT - VIEW_H
 FPS = 60
+TEXT_CACHE_MAX = 512  # rendered text surfaces kept by Renderer.render_text
+MENU_CACHE_MAX = 64  # option lists whose layout Renderer.draw_center_menu keeps
 FONT_NAME = None
 FONT_PATH = "fonts/prstart.ttf"
 
@@ -105,6 +120,27 @@ CLASS_COSTS = {"Rogue": 25, "Fighter": 35, "Priest": 40, "Mage": 45}
 
 DIRS = [(0, -1), (1, 0), (0, 1), (-1, 0)]
 DIR_NAMES = ["N", "E", "S", "W"]
+# Screen-space angle (radians, y down) for each facing, indexed like DIRS
+FACING_ANGLES = (-math.pi / 2, 0.0, math.pi / 2, math.pi)
+# Torch flicker phase for each value of the per-tile hash (tx*37 + ty*71) mod 256
+_FLICKER_PHASE = tuple(k / 256.0 * 2 * math.pi for k in range(256))
+
+# Directory listings for asset probes, one os.listdir per directory per run
+_LISTDIR_CACHE: Dict[str, set] = {}
+
+
+def _asset_exists(path: str) -> bool:
+    # Stands in for os.path.exists when looking for optional audio files
+    root, name = os.path.split(path)
+    root = root or '.'
+    names = _LISTDIR_CACHE.get(root)
+    if names is None:
+        try:
+            names = set(os.listdir(root))
+        except OSError:
+            names = set()
+        _LISTDIR_CACHE[root] = names
+    return name in names
 
 
 class MusicManager:
@@ -139,7 +175,7 @@ class MusicManager:
             return None
         try_paths = [filename, os.path.join('data', filename)]
         for p in try_paths:
-            if os.path.exists(p):
+            if _asset_exists(p):
                 try:
                     return pygame.mixer.Sound(p)
                 except Exception:
@@ -225,7 +261,7 @@ class SfxManager:
         for ext in exts:
             for root in ("data", "."):
                 path = os.path.join(root, base + ext)
-                if os.path.exists(path):
+                if _asset_exists(path):
                     return path
         return None
 
@@ -267,8 +303,12 @@ class SfxManager:
             pass
 
 
+_D6 = range(1, 7)
+
+
 def roll_stat():
-    return sum(random.randint(1, 6) for _ in range(3))
+    # 3d6 in one random.choices call instead of three randint calls through a generator
+    return sum(random.choices(_D6, k=3))
 
 
 def ability_mod(score: int) -> int:
@@ -284,6 +324,16 @@ class Equipment:
     acc1_id: Optional[str] = None
     acc2_id: Optional[str] = None
 
+    def to_dict(self):
+        return {
+            "weapon_atk": self.weapon_atk,
+            "armor_ac": self.armor_ac,
+            "weapon_id": self.weapon_id,
+            "armor_id": self.armor_id,
+            "acc1_id": self.acc1_id,
+            "acc2_id": self.acc2_id,
+        }
+
 
 @dataclass
 class Character:
@@ -313,6 +363,23 @@ class Character:
         self.hp = self.max_hp
         self.max_mp = max(0, BASE_MP[self.cls] + ability_mod(self.iq if self.cls == "Mage" else self.piety))
         self.mp = self.max_mp
+        # Accessory (ac, agi) bonuses for the accessory ids in _acc_key, see _acc_bonus
+        self._acc_key: Optional[Tuple[Optional[str], Optional[str]]] = None
+        self._acc_bonus_cache: Tuple[int, int] = (0, 0)
+
+    def _acc_bonus(self) -> Tuple[int, int]:
+        # Item lookups only happen when an accessory slot changes, not on every read
+        key = (self.equipment.acc1_id, self.equipment.acc2_id)
+        if key != self._acc_key:
+            acc_ac = agi = 0
+            for iid in key:
+                if iid:
+                    it = ITEMS_BY_ID.get(iid, {})
+                    acc_ac += it.get('ac', 0)
+                    agi += it.get('agi', 0)
+            self._acc_key = key
+            self._acc_bonus_cache = (acc_ac, agi)
+        return self._acc_bonus_cache
 
     @property
     def atk_bonus(self) -> int:
@@ -321,41 +388,66 @@ class Character:
     @property
     def defense_ac(self) -> int:
         # Base AC plus armor and accessory AC modifiers
-        acc_ac = 0
-        for iid in (self.equipment.acc1_id, self.equipment.acc2_id):
-            if iid:
-                acc_ac += ITEMS_BY_ID.get(iid, {}).get('ac', 0)
-        return self.ac + self.equipment.armor_ac + acc_ac
+        return self.ac + self.equipment.armor_ac + self._acc_bonus()[0]
 
     @property
     def agi_effective(self) -> int:
         # Base AGI plus accessory bonuses
-        bonus = 0
-        for iid in (self.equipment.acc1_id, self.equipment.acc2_id):
-            if iid:
-                bonus += ITEMS_BY_ID.get(iid, {}).get('agi', 0)
-        return self.agi + bonus
+        return self.agi + self._acc_bonus()[1]
 
     def to_dict(self):
-        d = asdict(self)
-        d["equipment"] = asdict(self.equipment)
-        return d
+        # Plain field reads; asdict() would walk and deep-copy every field by reflection
+        return {
+            "name": self.name,
+            "cls": self.cls,
+            "level": self.level,
+            "str_": self.str_,
+            "iq": self.iq,
+            "piety": self.piety,
+            "vit": self.vit,
+            "agi": self.agi,
+            "luck": self.luck,
+            "max_hp": self.max_hp,
+            "hp": self.hp,
+            "max_mp": self.max_mp,
+            "mp": self.mp,
+            "ac": self.ac,
+            "exp": self.exp,
+            "gold": self.gold,
+            "alive": self.alive,
+            "equipment": self.equipment.to_dict(),
+            "inventory": list(self.inventory),
+        }
 
     @staticmethod
     def from_dict(d):
         # Map legacy class names (e.g., Thief -> Rogue) for backward compatibility
-        cls_name = d.get("cls", "Fighter")
+        cls_name = str(d.get("cls", "Fighter"))
         if cls_name == "Thief":
             cls_name = "Rogue"
-        c = Character(d["name"], cls_name)
-        for k, v in d.items():
-            if k == "equipment":
-                c.equipment = Equipment(**v)
-            elif k == "cls":
-                # Normalize legacy class names
-                c.cls = "Rogue" if str(v) == "Thief" else str(v)
-            elif hasattr(c, k):
-                setattr(c, k, v)
+        # Fill the fields directly rather than constructing (which rolls six stats that
+        # the save then overwrites); a stat missing from an old save is still rolled
+        c = object.__new__(Character)
+        c.name = d["name"]
+        c.cls = cls_name
+        c.level = d.get("level", 1)
+        c.str_ = d["str_"] if "str_" in d else roll_stat()
+        c.iq = d["iq"] if "iq" in d else roll_stat()
+        c.piety = d["piety"] if "piety" in d else roll_stat()
+        c.vit = d["vit"] if "vit" in d else roll_stat()
+        c.agi = d["agi"] if "agi" in d else roll_stat()
+        c.luck = d["luck"] if "luck" in d else roll_stat()
+        c.__post_init__()
+        c.max_hp = d.get("max_hp", c.max_hp)
+        c.hp = d.get("hp", c.hp)
+        c.max_mp = d.get("max_mp", c.max_mp)
+        c.mp = d.get("mp", c.mp)
+        c.ac = d.get("ac", AC_BASE)
+        c.exp = d.get("exp", 0)
+        c.gold = d.get("gold", 0)
+        c.alive = d.get("alive", True)
+        c.equipment = Equipment(**d["equipment"]) if "equipment" in d else Equipment()
+        c.inventory = d.get("inventory", [])
         return c
 
 
@@ -365,6 +457,20 @@ class Party:
         self.active: List[int] = []
         self.gold: int = 0
         self.inventory: List[str] = []
+        # id(member) -> position in members, rebuilt lazily by index_of
+        self._index_by_id: Dict[int, int] = {}
+
+    def index_of(self, m: Character) -> int:
+        # members.index(m) without the linear scan. Entries are checked against the
+        # list on use, so appends, pops and reassignments just trigger a rebuild.
+        members = self.members
+        i = self._index_by_id.get(id(m))
+        if i is None or i >= len(members) or members[i] is not m:
+            self._index_by_id = {id(c): j for j, c in enumerate(members)}
+            i = self._index_by_id.get(id(m))
+            if i is None:
+                raise ValueError("member not in party")
+        return i
 
     def alive_members(self) -> List[Character]:
         return [c for c in self.members if c.alive and c.hp > 0]
@@ -373,13 +479,28 @@ class Party:
         return [self.members[i] for i in self.active if 0 <= i < len(self.members)]
 
     def alive_active_members(self) -> List[Character]:
-        return [c for c in self.active_members() if c.alive and c.hp > 0]
+        # Single pass over active indices, no intermediate active_members() list
+        members = self.members
+        n = len(members)
+        return [members[i] for i in self.active if 0 <= i < n and members[i].alive and members[i].hp > 0]
+
+    def alive_active_indices(self) -> List[int]:
+        # Member indices behind alive_active_members(), in the same order, for callers
+        # that need the index (targeting, turn tokens) and would otherwise look it up
+        members = self.members
+        n = len(members)
+        return [i for i in self.active if 0 <= i < n and members[i].alive and members[i].hp > 0]
 
     def all_active_alive(self) -> bool:
-        return len(self.active) > 0 and all(self.members[i].alive and self.members[i].hp > 0 for i in self.active if 0 <= i < len(self.members))
+        members = self.members
+        n = len(members)
+        return len(self.active) > 0 and all(members[i].alive and members[i].hp > 0 for i in self.active if 0 <= i < n)
 
     def any_active_alive(self) -> bool:
-        return len(self.alive_active_members()) > 0
+        # Stops at the first living member instead of building the whole list
+        members = self.members
+        n = len(members)
+        return any(0 <= i < n and members[i].alive and members[i].hp > 0 for i in self.active)
 
     def clamp_active(self):
         self.active = [i for i in self.active if 0 <= i < len(self.members)]
@@ -422,6 +543,9 @@ class Enemy:
     @staticmethod
     def from_base(base: Dict[str, Any]):
         hp = random.randint(base.get("hp_low", 6), base.get("hp_high", 10))
+        # Roll AGI only when the monster has none; a get() default would roll it every time
+        agi = base.get("agi")
+        drops = base.get("drops", [])
         return Enemy(
             id=base.get("id", base.get("name", "monster").lower().replace(' ', '_')),
             name=base.get("name", "Monster"),
@@ -432,33 +556,45 @@ class Enemy:
             exp=int(base.get("exp", 10)),
             gold_low=int(base.get("gold_low", 1)),
             gold_high=int(base.get("gold_high", 8)),
-            agi=int(base.get("agi", random.randint(5, 12))),
-            drops=list(base.get("drops", [])) if isinstance(base.get("drops", []), list) else [],
+            agi=int(agi) if agi is not None else random.randint(5, 12),
+            drops=list(drops) if isinstance(drops, list) else [],
         )
 
 
 # ------------------------------ Maze / Levels -------------------------------
 
-def generate_base_grid(w: int, h: int) -> List[List[int]]:
-    grid = [[T_WALL] * w for _ in range(h)]
-    for y in range(1, h - 1):
-        for x in range(1, w - 1):
-            grid[y][x] = T_EMPTY
-    # simple internal walls
-    for x in range(2, w - 2, 4):
-        for y in range(2, h - 2):
-            if y % 3 != 0:
-                grid[y][x] = T_WALL
+# A level grid is one bytearray per row (one byte per tile): compact, contiguous rows
+# that still index as grid[y][x] like the old list-of-lists
+Grid = List[bytearray]
+
+
+def generate_base_grid(w: int, h: int) -> Grid:
+    # Whole-row slice stores instead of per-cell loops
+    grid = [bytearray([T_WALL]) * w for _ in range(h)]
+    inner = bytes([T_EMPTY]) * max(0, w - 2)
+    for row in grid[1:h - 1]:
+        row[1:w - 1] = inner
+    # simple internal walls: every 4th column, skipping rows divisible by 3
+    posts = bytes([T_WALL]) * len(range(2, w - 2, 4))
+    for y in range(2, h - 2):
+        if y % 3 != 0:
+            grid[y][2:w - 2:4] = posts
     # starting room
-    for y in range(1, 5):
-        for x in range(1, 5):
-            grid[y][x] = T_EMPTY
+    for row in grid[1:5]:
+        row[1:5] = bytes([T_EMPTY]) * 4
     return grid
 
 
+def unpack_grid(g: Dict[str, Any]) -> Grid:
+    # Packed level grid (grid_v 2, written by editor.py): base64 of row-major tile bytes
+    w, h = int(g['w']), int(g['h'])
+    raw = base64.b64decode(g['cells'])
+    return [bytearray(raw[y * w:(y + 1) * w]) for y in range(h)]
+
+
 @dataclass
 class Level:
-    grid: List[List[int]]
+    grid: Grid
     stairs_down: Optional[Tuple[int, int]] = None
     stairs_up: Optional[Tuple[int, int]] = None
     town_portal: Optional[Tuple[int, int]] = None
@@ -487,15 +623,22 @@ class Dungeon:
         try:
             path = os.path.join('data', 'levels', f'level{ix}.json')
             if os.path.exists(path):
-                with open(path) as f:
-                    data = json.load(f)
+                with open(path, 'rb') as f:
+                    data = _loads(f.read())
                 # Grid
                 g = data.get('grid')
-                if isinstance(g, list) and g and isinstance(g[0], list):
+                if data.get('grid_v') == 2 and isinstance(g, dict):
+                    g = unpack_grid(g)
+                if isinstance(g, list) and g and isinstance(g[0], (list, bytearray)):
                     h = min(self.h, len(g))
                     w = min(self.w, len(g[0]))
                     newg = generate_base_grid(self.w, self.h)
                     for y in range(h):
+                        if isinstance(g[y], bytearray):
+                            # Unpacked rows are already tile bytes: copy the row in one slice
+                            row = g[y][:w]
+                            newg[y][:len(row)] = row
+                            continue
                         for x in range(w):
                             try:
                                 newg[y][x] = int(g[y][x])
@@ -545,20 +688,21 @@ class Dungeon:
 
     def _find_far_open(self, ix: int) -> Tuple[int, int]:
         grid = self.levels[ix].grid
-        candidates = []
-        for y in range(self.h - 5, 2, -1):
-            for x in range(self.w - 5, 2, -1):
-                if grid[y][x] == T_EMPTY:
-                    candidates.append((x, y))
+        candidates = [(x, y) for y in range(self.h - 5, 2, -1) for x in range(self.w - 5, 2, -1)
+                      if grid[y][x] == T_EMPTY]
         if not candidates:
-            for y in range(1, self.h - 1):
-                for x in range(1, self.w - 1):
-                    if grid[y][x] == T_EMPTY:
-                        candidates.append((x, y))
+            candidates = [(x, y) for y in range(1, self.h - 1) for x in range(1, self.w - 1)
+                          if grid[y][x] == T_EMPTY]
         return random.choice(candidates) if candidates else (2, 2)
 
 
 # ------------------------------ Hit/FX --------------------------------------
+# Shake offsets in eighths of the amplitude, rolled once from a private RNG so the
+# cosmetic jitter neither costs randint calls per frame nor disturbs game rolls
+_JITTER_RNG = random.Random(0)
+_JITTER = [_JITTER_RNG.randint(-8, 8) for _ in range(1024)]
+
+
 class HitEffects:
     def __init__(self):
         self.effects: Dict[Tuple[str, int], Dict[str, Any]] = {}
@@ -579,10 +723,11 @@ class HitEffects:
             return (0, 0), base_color
         frac = max(0.0, t_left / e["duration"])
         amp = max(1, int(e["intensity"] * (0.5 + 0.5 * frac)))
-        ox = random.randint(-amp, amp)
-        oy = random.randint(-amp, amp)
-        flash_color = e.get("color", RED)
-        color = flash_color if (now // 60) % 2 == 0 else base_color
+        # Step through the table every 8ms; the index spreads simultaneous shakes apart
+        i = ((now >> 3) + index * 131) & 1023
+        ox = _JITTER[i] * amp // 8
+        oy = _JITTER[(i + 512) & 1023] * amp // 8
+        color = (e.get("color", RED), base_color)[(now // 60) & 1]
         return (ox, oy), color
 
 
@@ -593,6 +738,30 @@ class Renderer:
         self.font = self._load_font(16)
         self.font_small = self._load_font(12)
         self.font_big = self._load_font(20)
+        self._text_cache: Dict[Tuple[int, str, Tuple[int, ...], bool], pygame.Surface] = {}
+        # Torch FOV darkness mask, allocated on first use and refilled each frame
+        self._fov_mask: Optional[pygame.Surface] = None
+        # LOS ray offsets by (dx, dy), see _ray_cells
+        self._rays: Dict[Tuple[int, int], Tuple[Tuple[int, int], ...]] = {}
+        # Visible-tile offsets per (radius, spread, facing), see _fov_offsets
+        self._fov_offsets_cache: Dict[Tuple[int, float, int], Tuple[Tuple[int, int, bool], ...]] = {}
+        # Torch FOV per-tile terms for a player on a whole tile, see _torch_tiles
+        self._torch_cache: Dict[tuple, Tuple[Tuple[int, int, bool, int, float], ...]] = {}
+        # Pre-drawn maze tiles keyed by (cell, tile), see _tile_surface
+        self._tile_surfs: Dict[Tuple[int, int], pygame.Surface] = {}
+        self._fog_tiles: Dict[int, Tuple[pygame.Surface, pygame.Surface]] = {}
+        # Last drawn top-down tile window and its key, see _topdown_window
+        self._window_surf: Optional[pygame.Surface] = None
+        self._window_key: Optional[tuple] = None
+        # Vision cone darkness mask, and the scratch layer its fallback path blends through
+        self._cone_mask: Optional[pygame.Surface] = None
+        # Flat tint layers by size, with the colour each currently holds, see shade()
+        self._shade_layers: Dict[Tuple[int, int], List[Any]] = {}
+        # Combat HUD panel backgrounds keyed by (w, h, border colour), see _panel
+        self._panels: Dict[Tuple[int, int, Tuple[int, ...]], pygame.Surface] = {}
+        # Centered menu layout per option tuple: (text height, panel), see draw_center_menu
+        self._menu_cache: Dict[Tuple[str, ...], Tuple[int, pygame.Surface]] = {}
+        self._step_tmp = pygame.Surface((WIDTH, VIEW_H), pygame.SRCALPHA)
 
     def _load_font(self, size: int) -> pygame.font.Font:
         try:
@@ -605,14 +774,48 @@ class Renderer:
         pygame.draw.rect(self.screen, (30, 30, 34), (0, 0, WIDTH, VIEW_H))
         pygame.draw.rect(self.screen, (28, 28, 32), (0, VIEW_H, WIDTH, LOG_H))
 
+    def shade(self, surf: pygame.Surface, rgba: Tuple[int, int, int, int]):
+        # Blend a flat RGBA colour over the whole surface (dimmers, flashes, fades).
+        # One layer per size is reused and only refilled when the colour changes.
+        size = surf.get_size()
+        entry = self._shade_layers.get(size)
+        if entry is None:
+            entry = self._shade_layers[size] = [pygame.Surface(size, pygame.SRCALPHA), None]
+        if entry[1] != rgba:
+            entry[0].fill(rgba)
+            entry[1] = rgba
+        surf.blit(entry[0], (0, 0))
+
+    def _panel(self, w: int, h: int, border_col) -> pygame.Surface:
+        # Filled HUD window with its 2px border; sizes and border colours (white,
+        # yellow, hit flashes) come from a handful of values, so each is drawn once.
+        key = (w, h, tuple(border_col))
+        surf = self._panels.get(key)
+        if surf is None:
+            surf = self._panels[key] = pygame.Surface((w, h)).convert()
+            surf.fill((20, 20, 28))
+            pygame.draw.rect(surf, border_col, surf.get_rect(), 2)
+        return surf
+
+    def render_text(self, font: pygame.font.Font, txt: str, color, aa: bool = True) -> pygame.Surface:
+        # HUD names, HP/MP lines and menu labels repeat frame to frame; rasterize each
+        # (font, text, color) once. Oldest entries go first when the cache is full.
+        key = (id(font), txt, tuple(color), aa)
+        surf = self._text_cache.get(key)
+        if surf is None:
+            if len(self._text_cache) >= TEXT_CACHE_MAX:
+                del self._text_cache[next(iter(self._text_cache))]
+            surf = self._text_cache[key] = font.render(txt, aa, color).convert_alpha()
+        return surf
+
     def text(self, surf, txt, pos, color=WHITE, aa=True):
-        surf.blit(self.font.render(txt, aa, color), pos)
+        surf.blit(self.render_text(self.font, txt, color, aa), pos)
 
     def text_small(self, surf, txt, pos, color=LIGHT, aa=True):
-        surf.blit(self.font_small.render(txt, aa, color), pos)
+        surf.blit(self.render_text(self.font_small, txt, color, aa), pos)
 
     def text_big(self, surf, txt, pos, color=WHITE, aa=True):
-        surf.blit(self.font_big.render(txt, aa, color), pos)
+        surf.blit(self.render_text(self.font_big, txt, color, aa), pos)
 
     def draw_log(self, log_lines: List[str]):
         panel = self.screen.subsurface(pygame.Rect(0, VIEW_H, WIDTH, LOG_H))
@@ -641,29 +844,7 @@ class Renderer:
         oy = (VIEW_H - total_h) // 2
         # Precompute pixel shift from tile shift
         shift_px = (world_shift_tiles[0] * cell, world_shift_tiles[1] * cell)
-        for y in range(py - radius, py + radius + 1):
-            for x in range(px - radius, px + radius + 1):
-                sx = ox + (x - (px - radius)) * cell + int(shift_px[0])
-                sy = oy + (y - (py - radius)) * cell + int(shift_px[1])
-                if 0 <= x < len(grid[0]) and 0 <= y < len(grid):
-                    t = grid[y][x]
-                    if t == T_WALL:
-                        pygame.draw.rect(view, (40, 40, 70), (sx, sy, cell - 1, cell - 1), 1)
-                    else:
-                        pygame.draw.rect(view, (24, 24, 34), (sx, sy, cell - 1, cell - 1))
-                        if t == T_TOWN:
-                            pygame.draw.circle(view, BLUE, (sx + cell // 2, sy + cell // 2), max(3, cell // 6))
-                        elif t == T_STAIRS_D:
-                            pygame.draw.polygon(view, YELLOW, [(sx + cell // 5, sy + cell // 5), (sx + cell - cell // 5, sy + cell // 5), (sx + cell // 2, sy + cell - cell // 5)])
-                        elif t == T_STAIRS_U:
-                            pygame.draw.polygon(view, GREEN, [(sx + cell // 5, sy + cell - cell // 5), (sx + cell - cell // 5, sy + cell - cell // 5), (sx + cell // 2, sy + cell // 5)])
-                        elif t == T_LOCKED:
-                            # Draw a locked door as a thick line with a small lock glyph
-                            pygame.draw.rect(view, (36, 28, 22), (sx, sy + cell//3, cell - 1, cell//3))
-                            pygame.draw.rect(view, (120, 100, 60), (sx, sy + cell//3, cell - 1, cell//3), 2)
-                            # lock
-                            lx = sx + cell//2 - 4; ly = sy + cell//2 - 6
-                            pygame.draw.rect(view, (200, 180, 90), (lx, ly, 8, 8), 1)
+        view.blit(self._topdown_window(grid, px, py, radius, cell), (ox + int(shift_px[0]), oy + int(shift_px[1])))
         # Draw chests on top of floor tiles (simple icon), within the radius window
         if chests:
             for c in chests:
@@ -682,23 +863,22 @@ class Renderer:
         pygame.draw.line(view, PURPLE, (pxs, pys), (pxs + d[0] * max(10, cell // 2), pys + d[1] * max(10, cell // 2)), 2)
         # Optional overlays: fog-of-war or legacy torch FOV
         if seen_tiles is not None:
-            fog = pygame.Surface((WIDTH, VIEW_H), pygame.SRCALPHA)
-            now = pygame.time.get_ticks() / 1000.0
-            for y in range(py - radius, py + radius + 1):
-                for x in range(px - radius, px + radius + 1):
-                    if not (0 <= x < len(grid[0]) and 0 <= y < len(grid)):
-                        continue
-                    sx = ox + (x - (px - radius)) * cell + int(shift_px[0])
-                    sy = oy + (y - (py - radius)) * cell + int(shift_px[1])
-                    rect = pygame.Rect(sx, sy, max(1, cell - 1), max(1, cell - 1))
+            # Fog cells are blitted straight onto the view in one blits() call. Each pixel
+            # gets the same alpha blend a full-view fog layer would have given it, and
+            # the untouched pixels of such a layer were fully transparent anyway.
+            unseen, dim = self._fog_cells(cell)
+            gw, gh = len(grid[0]), len(grid)
+            fog = []
+            for y in range(max(0, py - radius), min(gh, py + radius + 1)):
+                sy = oy + (y - (py - radius)) * cell + int(shift_px[1])
+                for x in range(max(0, px - radius), min(gw, px + radius + 1)):
                     if (x, y) not in seen_tiles:
                         # Unseen: match the maze background color for a seamless fog look
-                        pygame.draw.rect(fog, (18, 18, 22, 255), rect)
-                    else:
+                        fog.append((unseen, (ox + (x - (px - radius)) * cell + int(shift_px[0]), sy)))
+                    elif visible_tiles is None or (x, y) not in visible_tiles:
                         # Seen: dimmer if not currently visible (lighter than fog of war)
-                        if visible_tiles is None or (x, y) not in visible_tiles:
-                            pygame.draw.rect(fog, (0, 0, 0, 90), rect)
-            view.blit(fog, (0, 0))
+                        fog.append((dim, (ox + (x - (px - radius)) * cell + int(shift_px[0]), sy)))
+            view.blits(fog, False)
         elif apply_fov:
             # Legacy torch FOV
             pxf = px + float(player_frac[0])
@@ -708,56 +888,113 @@ class Renderer:
                                      player_center_frac=(pxf, pyf))
         self.text_small(view, f"L{level_ix} pos {pos} {DIR_NAMES[facing]}", (12, 6))
 
+    def _topdown_window(self, grid: Grid, px: int, py: int, radius: int, cell: int) -> pygame.Surface:
+        # The whole visible tile window as one surface, rebuilt only when the player
+        # steps or a tile inside it changes (the key holds the window's tile bytes)
+        x0, y0 = px - radius, py - radius
+        size = radius * 2 + 1
+        gw, gh = len(grid[0]), len(grid)
+        key = (cell, x0, y0, gw, gh, b''.join(row[max(0, x0):x0 + size] for row in grid[max(0, y0):y0 + size]))
+        if self._window_key == key:
+            return self._window_surf
+        surf = self._window_surf
+        if surf is None or surf.get_width() != size * cell:
+            surf = self._window_surf = pygame.Surface((size * cell, size * cell)).convert()
+        surf.fill((18, 18, 22))
+        tiles = []
+        for y in range(max(0, y0), min(gh, y0 + size)):
+            for x in range(max(0, x0), min(gw, x0 + size)):
+                tiles.append((self._tile_surface(cell, grid[y][x]), ((x - x0) * cell, (y - y0) * cell)))
+        surf.blits(tiles, False)
+        self._window_key = key
+        return surf
+
+    def _fog_cells(self, cell: int) -> Tuple[pygame.Surface, pygame.Surface]:
+        # (unseen, seen-but-not-visible) fog squares for one tile, made once per cell size
+        pair = self._fog_tiles.get(cell)
+        if pair is None:
+            size = (max(1, cell - 1), max(1, cell - 1))
+            unseen = pygame.Surface(size, pygame.SRCALPHA)
+            unseen.fill((18, 18, 22, 255))
+            dim = pygame.Surface(size, pygame.SRCALPHA)
+            dim.fill((0, 0, 0, 90))
+            pair = self._fog_tiles[cell] = (unseen, dim)
+        return pair
+
+    def _tile_surface(self, cell: int, t: int) -> pygame.Surface:
+        # Each tile type is drawn once per cell size and then blitted; tiles never overlap,
+        # so an opaque (cell-1)-square with the view background baked in is exact
+        if t not in (T_WALL, T_TOWN, T_STAIRS_D, T_STAIRS_U, T_LOCKED):
+            t = T_EMPTY
+        key = (cell, t)
+        surf = self._tile_surfs.get(key)
+        if surf is not None:
+            return surf
+        surf = pygame.Surface((max(1, cell - 1), max(1, cell - 1))).convert()
+        surf.fill((18, 18, 22))
+        if t == T_WALL:
+            pygame.draw.rect(surf, (40, 40, 70), (0, 0, cell - 1, cell - 1), 1)
+        else:
+            pygame.draw.rect(surf, (24, 24, 34), (0, 0, cell - 1, cell - 1))
+            if t == T_TOWN:
+                pygame.draw.circle(surf, BLUE, (cell // 2, cell // 2), max(3, cell // 6))
+            elif t == T_STAIRS_D:
+                pygame.draw.polygon(surf, YELLOW, [(cell // 5, cell // 5), (cell - cell // 5, cell // 5), (cell // 2, cell - cell // 5)])
+            elif t == T_STAIRS_U:
+                pygame.draw.polygon(surf, GREEN, [(cell // 5, cell - cell // 5), (cell - cell // 5, cell - cell // 5), (cell // 2, cell // 5)])
+            elif t == T_LOCKED:
+                # Draw a locked door as a thick line with a small lock glyph
+                pygame.draw.rect(surf, (36, 28, 22), (0, cell//3, cell - 1, cell//3))
+                pygame.draw.rect(surf, (120, 100, 60), (0, cell//3, cell - 1, cell//3), 2)
+                # lock
+                lx = cell//2 - 4; ly = cell//2 - 6
+                pygame.draw.rect(surf, (200, 180, 90), (lx, ly, 8, 8), 1)
+        self._tile_surfs[key] = surf
+        return surf
+
     def _overlay_vision_cone(self, surf: pygame.Surface, center: Tuple[int, int], facing: int,
                               spread_deg: float = 80.0, steps: int = 16, edge_alpha: int = 220):
         """Darken outside the player's field of view completely, and inside the cone
         keep it bright near the player (no darkening) and fade darker with distance.
         """
         try:
-            # Full black overlay everywhere to start
-            overlay = pygame.Surface((WIDTH, VIEW_H), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, 255))
-
-            # We build a mask whose alpha is the desired local darkness (lower alpha = brighter)
-            # Start with fully opaque (black) everywhere, then progressively take the minimum
-            # alpha inside the cone using BLEND_RGBA_MIN across steps to form a gradient.
-            mask = pygame.Surface((WIDTH, VIEW_H), pygame.SRCALPHA)
+            # We build a mask whose alpha is the desired local darkness (lower alpha = brighter),
+            # starting fully opaque (black) everywhere. The step cones share the apex and
+            # angles, so each one contains the smaller ones, and alpha grows outward. Drawing
+            # them largest first, straight into the mask, leaves every pixel with the alpha
+            # of the smallest cone covering it: the same result as MIN-blitting each step
+            # through a temp surface, with no full-surface blend passes.
+            mask = self._cone_mask
+            if mask is None:
+                mask = self._cone_mask = pygame.Surface((WIDTH, VIEW_H), pygame.SRCALPHA)
             mask.fill((0, 0, 0, 255))
 
             # Facing to angle (radians). 0:N,1:E,2:S,3:W
-            angle_map = {0: -math.pi / 2, 1: 0.0, 2: math.pi / 2, 3: math.pi}
-            ang = angle_map.get(facing, 0.0)
+            ang = FACING_ANGLES[facing]
             spread = math.radians(spread_deg)
             length = max(WIDTH, VIEW_H) * 1.35  # extend beyond view
 
             steps = max(4, int(steps))
-            # Reusable temp surface for min-blending each step
-            step_surf = pygame.Surface((WIDTH, VIEW_H), pygame.SRCALPHA)
+            a0 = ang - spread / 2
+            a1 = ang + spread / 2
             # Use a slight easing so brightness persists a bit near player
-            for i in range(1, steps + 1):
+            for i in range(steps, 0, -1):
                 frac = i / steps  # 0..1 outward
                 # Darkness grows with distance (0 near, edge_alpha near far)
                 a = int(edge_alpha * (frac ** 1.2))
                 L = length * frac
-                a0 = ang - spread / 2
-                a1 = ang + spread / 2
                 p1 = (center[0] + math.cos(a0) * L, center[1] + math.sin(a0) * L)
                 p2 = (center[0] + math.cos(a1) * L, center[1] + math.sin(a1) * L)
-                # Draw this step's cone to a temp surface, then MIN-blit into mask
-                step_surf.fill((0, 0, 0, 255))
-                pygame.draw.polygon(step_surf, (0, 0, 0, a), [center, p1, p2])
-                mask.blit(step_surf, (0, 0), special_flags=pygame.BLEND_RGBA_MIN)
+                pygame.draw.polygon(mask, (0, 0, 0, a), [center, p1, p2])
 
             # Ensure absolute brightness at the player's immediate position
             pygame.draw.circle(mask, (0, 0, 0, 0), (int(center[0]), int(center[1])), 4)
 
-            # Apply minimum: overlay alpha becomes the mask alpha, leaving outside-of-cone fully black
-            overlay.blit(mask, (0, 0), special_flags=pygame.BLEND_RGBA_MIN)
-            surf.blit(overlay, (0, 0))
+            # Outside the cone the mask is still fully black
+            surf.blit(mask, (0, 0))
         except Exception:
             # Fallback: hard cone with transparency ramp using concentric blits
-            angle_map = {0: -math.pi / 2, 1: 0.0, 2: math.pi / 2, 3: math.pi}
-            ang = angle_map.get(facing, 0.0)
+            ang = FACING_ANGLES[facing]
             spread = math.radians(spread_deg)
             length = max(WIDTH, VIEW_H) * 1.3
             overlay = pygame.Surface((WIDTH, VIEW_H), pygame.SRCALPHA)
@@ -770,46 +1007,82 @@ class Renderer:
                 L = length * frac
                 p1 = (center[0] + math.cos(a0) * L, center[1] + math.sin(a0) * L)
                 p2 = (center[0] + math.cos(a1) * L, center[1] + math.sin(a1) * L)
-                temp = pygame.Surface((WIDTH, VIEW_H), pygame.SRCALPHA)
+                temp = self._step_tmp
+                temp.fill((0, 0, 0, 0))
                 pygame.draw.polygon(temp, (0, 0, 0, a), [center, p1, p2])
                 overlay.blit(temp, (0, 0), special_flags=pygame.BLEND_RGBA_MIN)
             pygame.draw.circle(overlay, (0, 0, 0, 0), (int(center[0]), int(center[1])), 4)
             surf.blit(overlay, (0, 0))
 
     def _angle_for_facing(self, facing: int) -> float:
-        return {0: -math.pi / 2, 1: 0.0, 2: math.pi / 2, 3: math.pi}.get(facing, 0.0)
+        return FACING_ANGLES[facing]
 
     def _angle_diff(self, a: float, b: float) -> float:
         d = (a - b + math.pi) % (2 * math.pi) - math.pi
         return abs(d)
 
-    def _los_clear(self, grid: List[List[int]], x0: int, y0: int, x1: int, y1: int) -> bool:
+    def _ray_cells(self, dx: int, dy: int) -> Tuple[Tuple[int, int], ...]:
+        """Offsets of the cells strictly between (0,0) and (dx,dy) on the Bresenham line.
+        The line only depends on the delta, so each one is walked once and cached."""
+        ray = self._rays.get((dx, dy))
+        if ray is None:
+            cells = []
+            x = y = 0
+            adx, ady = abs(dx), abs(dy)
+            sx = 1 if dx > 0 else -1
+            sy = 1 if dy > 0 else -1
+            err = adx - ady
+            while True:
+                e2 = 2 * err
+                if e2 > -ady:
+                    err -= ady
+                    x += sx
+                if e2 < adx:
+                    err += adx
+                    y += sy
+                if x == dx and y == dy:
+                    break
+                cells.append((x, y))
+            ray = self._rays[(dx, dy)] = tuple(cells)
+        return ray
+
+    def _fov_offsets(self, radius: int, spread_deg: float, facing: int) -> Tuple[Tuple[int, int, bool], ...]:
+        """Tile offsets (dx, dy, near3) inside the round radius and the facing cone.
+        near3 marks the always-visible 3x3 around the player, which skips LOS.
+        Depends only on the parameters, so each combination is computed once."""
+        key = (radius, spread_deg, facing)
+        offsets = self._fov_offsets_cache.get(key)
+        if offsets is None:
+            ang_face = self._angle_for_facing(facing)
+            half = math.radians(spread_deg) / 2.0
+            r2 = (radius + 0.5) * (radius + 0.5)
+            found = []
+            for dy in range(-radius, radius + 1):
+                for dx in range(-radius, radius + 1):
+                    if dx * dx + dy * dy > r2:
+                        continue
+                    near3 = max(abs(dx), abs(dy)) <= 1
+                    if near3 or self._angle_diff(math.atan2(dy, dx), ang_face) <= half:
+                        found.append((dx, dy, near3))
+            offsets = self._fov_offsets_cache[key] = tuple(found)
+        return offsets
+
+    def _los_clear(self, grid: Grid, x0: int, y0: int, x1: int, y1: int) -> bool:
         """Return True if line from (x0,y0) to (x1,y1) is not blocked by walls.
         Allows seeing the first wall cell itself, but not beyond it."""
-        x, y = x0, y0
-        dx = abs(x1 - x0)
-        dy = abs(y1 - y0)
-        sx = 1 if x0 < x1 else -1
-        sy = 1 if y0 < y1 else -1
-        err = dx - dy
         w = len(grid[0]); h = len(grid)
-        while True:
-            if not (0 <= x < w and 0 <= y < h):
-                return False
-            if (x, y) == (x1, y1):
-                return True
-            # If we hit a wall before reaching target, blocked
-            if (x, y) != (x0, y0) and (x, y) != (x1, y1) and grid[y][x] == T_WALL:
+        if not (0 <= x0 < w and 0 <= y0 < h and 0 <= x1 < w and 0 <= y1 < h):
+            return False
+        if x0 == x1 and y0 == y1:
+            return True
+        # Cells between two in-bounds endpoints stay inside their bounding box,
+        # so only the walls along the cached ray need checking
+        for cx, cy in self._ray_cells(x1 - x0, y1 - y0):
+            if grid[y0 + cy][x0 + cx] == T_WALL:
                 return False
-            e2 = 2 * err
-            if e2 > -dy:
-                err -= dy
-                x += sx
-            if e2 < dx:
-                err += dx
-                y += sy
-
-    def _overlay_torch_fov(self, surf: pygame.Surface, grid: List[List[int]],
+        return True
+
+    def _overlay_torch_fov(self, surf: pygame.Surface, grid: Grid,
                             px: int, py: int, facing: int,
                             cell: int, ox: int, oy: int, radius: int,
                             world_px_off: int = 0, world_py_off: int = 0,
@@ -819,86 +1092,99 @@ class Renderer:
         - Outside the cone is fully black.
         - Near the player is bright (alpha ~0), darkens with distance.
         - Light flickers slightly over time like a torch."""
-        try:
-            overlay = pygame.Surface((WIDTH, VIEW_H), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, 255))  # fully black everywhere
-
-            mask = pygame.Surface((WIDTH, VIEW_H), pygame.SRCALPHA)
-            mask.fill((0, 0, 0, 255))  # start fully dark; lower alpha in lit tiles
-
-            ang_face = self._angle_for_facing(facing)
-            half = math.radians(spread_deg) / 2.0
-            max_dist = max(1.0, float(radius))
-            now = pygame.time.get_ticks() / 1000.0
-            # fractional player center (for smooth FOV following during movement)
-            pxf, pyf = (float(px), float(py))
-            if player_center_frac is not None:
-                pxf, pyf = player_center_frac
-
-            # Iterate tiles within the drawn radius
-            for ty in range(py - radius, py + radius + 1):
-                if not (0 <= ty < len(grid)):
-                    continue
-                for tx in range(px - radius, px + radius + 1):
-                    if not (0 <= tx < len(grid[0])):
-                        continue
-                    dx = tx - pxf
-                    dy = ty - pyf
-                    # Skip far corners outside circular-ish bound for a nicer edge
-                    if dx * dx + dy * dy > (radius + 0.5) * (radius + 0.5):
-                        continue
-                    ang = math.atan2(dy, dx)
-                    near3 = (max(abs(dx), abs(dy)) <= 1.0)
-                    if not near3:
-                        if self._angle_diff(ang, ang_face) > half:
-                            continue  # outside facing cone
-                        # Use integer tile for LOS from the closest of start/end tiles
-                        los_px, los_py = px, py
-                        # Prefer the nearer whole tile to the fractional center
-                        npx = round(pxf)
-                        npy = round(pyf)
-                        if 0 <= npx < len(grid[0]) and 0 <= npy < len(grid):
-                            los_px, los_py = int(npx), int(npy)
-                        if not self._los_clear(grid, los_px, los_py, tx, ty):
-                            continue  # blocked by walls
-
-                    # Distance-based darkness (0 near -> edge_alpha far)
-                    dist = max(0.0, math.hypot(dx, dy))
-                    if near3:
-                        # Always-visible comfort bubble around player (3x3). Keep very bright.
-                        # Use a very small base darkness by distance to hint depth.
-                        base = min(1.0, (dist / 1.5) ** 1.0)
-                        a = int(min(50, 35 * base))  # 0..~35
-                    else:
-                        base = (dist / max_dist) ** gamma
-                        a = int(edge_alpha * min(1.0, max(0.0, base)))
-
-                    # Subtle torch flicker: vary phase per tile, mild amplitude
-                    phase = ((tx * 37 + ty * 71) % 256) / 256.0 * 2 * math.pi
-                    if near3:
-                        amp = 4 + 2 * (dist / 1.5)  # very subtle close to player
-                    else:
-                        amp = 12 + 6 * (dist / max_dist)  # slightly stronger farther
-                    flicker = math.sin(now * 6.0 + phase) * amp
-                    a = int(max(0, min(255, a + flicker)))
-
-                    # Brighten player's own tile fully
-                    if int(round(pxf)) == tx and int(round(pyf)) == ty:
-                        a = 0
-
-                    # Draw to mask at the tile's screen rect, leave a 1px gutter
-                    sx = ox + (tx - (px - radius)) * cell
-                    sy = oy + (ty - (py - radius)) * cell
-                    rect = pygame.Rect(int(sx + world_px_off), int(sy + world_py_off), max(1, cell - 1), max(1, cell - 1))
-                    pygame.draw.rect(mask, (0, 0, 0, a), rect)
-
-            # Apply min blending so mask alpha reduces darkness in lit areas
-            overlay.blit(mask, (0, 0), special_flags=pygame.BLEND_RGBA_MIN)
-            surf.blit(overlay, (0, 0))
-        except Exception:
-            # If anything goes wrong, fall back to simple non-LOS cone
+        if not grid or not grid[0]:
+            # No map to trace LOS through: fall back to simple non-LOS cone
             self._overlay_vision_cone(surf, (ox + radius * cell + cell // 2, oy + radius * cell + cell // 2), facing,
                                       spread_deg=spread_deg, steps=12, edge_alpha=edge_alpha)
+            return
+        # One mask surface is reused across frames. MIN-blitting it onto an all-black
+        # overlay would just reproduce the mask, so it is blitted directly.
+        mask = self._fov_mask
+        if mask is None:
+            mask = self._fov_mask = pygame.Surface((WIDTH, VIEW_H), pygame.SRCALPHA)
+        mask.fill((0, 0, 0, 255))  # start fully dark; lower alpha in lit tiles
+
+        now = pygame.time.get_ticks() / 1000.0
+        # fractional player center (for smooth FOV following during movement)
+        pxf, pyf = (float(px), float(py))
+        if player_center_frac is not None:
+            pxf, pyf = player_center_frac
+
+        gw, gh = len(grid[0]), len(grid)
+        # LOS starts from the whole tile nearest the fractional center, if it is on the map
+        npx, npy = int(round(pxf)), int(round(pyf))
+        los_px, los_py = (npx, npy) if 0 <= npx < gw and 0 <= npy < gh else (px, py)
+
+        # Cone, distance darkness and flicker amplitude per tile come from _torch_tiles;
+        # only map bounds, LOS and the time-varying flicker are evaluated here
+        for i, j, near3, a, amp in self._torch_tiles(px, py, pxf, pyf, facing, radius, spread_deg, edge_alpha, gamma):
+            tx, ty = px + i, py + j
+            if not (0 <= tx < gw and 0 <= ty < gh):
+                continue
+            if not near3 and not self._los_clear(grid, los_px, los_py, tx, ty):
+                continue  # blocked by walls
+
+            # Subtle torch flicker: vary phase per tile, mild amplitude
+            phase = _FLICKER_PHASE[(tx * 37 + ty * 71) & 255]
+            flicker = math.sin(now * 6.0 + phase) * amp
+            a = int(max(0, min(255, a + flicker)))
+
+            # Brighten player's own tile fully
+            if npx == tx and npy == ty:
+                a = 0
+
+            # Draw to mask at the tile's screen rect, leave a 1px gutter
+            sx = ox + (i + radius) * cell
+            sy = oy + (j + radius) * cell
+            rect = pygame.Rect(int(sx + world_px_off), int(sy + world_py_off), max(1, cell - 1), max(1, cell - 1))
+            mask.fill((0, 0, 0, a), rect)
+
+        surf.blit(mask, (0, 0))
+
+    def _torch_tiles(self, px: int, py: int, pxf: float, pyf: float, facing: int, radius: int,
+                     spread_deg: float, edge_alpha: int, gamma: float) -> Tuple[Tuple[int, int, bool, int, float], ...]:
+        """Per-tile torch terms (i, j, near3, base alpha, flicker amplitude) for tiles at
+        (px+i, py+j) inside the round radius and the facing cone of a player centred at
+        (pxf, pyf). With the player on a whole tile (every frame but mid-step) the result
+        only depends on the parameters and is cached."""
+        whole = pxf == px and pyf == py
+        key = (facing, radius, spread_deg, edge_alpha, gamma)
+        if whole:
+            tiles = self._torch_cache.get(key)
+            if tiles is not None:
+                return tiles
+        ang_face = self._angle_for_facing(facing)
+        half = math.radians(spread_deg) / 2.0
+        max_dist = max(1.0, float(radius))
+        r2 = (radius + 0.5) * (radius + 0.5)
+        found = []
+        for j in range(-radius, radius + 1):
+            dy = (py + j) - pyf
+            for i in range(-radius, radius + 1):
+                dx = (px + i) - pxf
+                # Skip far corners outside circular-ish bound for a nicer edge
+                if dx * dx + dy * dy > r2:
+                    continue
+                near3 = (max(abs(dx), abs(dy)) <= 1.0)
+                if not near3 and self._angle_diff(math.atan2(dy, dx), ang_face) > half:
+                    continue  # outside facing cone
+                # Distance-based darkness (0 near -> edge_alpha far)
+                dist = max(0.0, math.hypot(dx, dy))
+                if near3:
+                    # Always-visible comfort bubble around player (3x3). Keep very bright.
+                    # Use a very small base darkness by distance to hint depth.
+                    base = min(1.0, (dist / 1.5) ** 1.0)
+                    a = int(min(50, 35 * base))  # 0..~35
+                    amp = 4 + 2 * (dist / 1.5)  # very subtle close to player
+                else:
+                    base = (dist / max_dist) ** gamma
+                    a = int(edge_alpha * min(1.0, max(0.0, base)))
+                    amp = 12 + 6 * (dist / max_dist)  # slightly stronger farther
+                found.append((i, j, near3, a, amp))
+        tiles = tuple(found)
+        if whole:
+            self._torch_cache[key] = tiles
+        return tiles
 
     # ---- Generic centered menu (no header) ----
     def draw_center_menu(self, options: List[str], selected: int):
@@ -906,21 +1192,31 @@ class Renderer:
         if not options:
             return
         pad_x, pad_y = 12, 10
-        text_w = max(self.font.size(s + "  ")[0] for s in options)
-        text_h = self.font.get_height()
-        w = text_w + pad_x * 2
-        h = text_h * len(options) + pad_y * 2
+        # Font metrics and the bordered panel only depend on the options, so measure
+        # and draw them once per list; labels come from the render_text cache
+        key = tuple(options)
+        layout = self._menu_cache.get(key)
+        if layout is None:
+            text_w = max(self.font.size(s + "  ")[0] for s in options)
+            text_h = self.font.get_height()
+            panel = pygame.Surface((text_w + pad_x * 2, text_h * len(options) + pad_y * 2)).convert()
+            panel.fill((16, 16, 20))
+            pygame.draw.rect(panel, YELLOW, panel.get_rect(), 2)
+            if len(self._menu_cache) >= MENU_CACHE_MAX:
+                del self._menu_cache[next(iter(self._menu_cache))]
+            layout = self._menu_cache[key] = (text_h, panel)
+        text_h, panel = layout
+        w, h = panel.get_size()
         x = WIDTH // 2 - w // 2
         y = VIEW_H // 2 - h // 2
-        rect = pygame.Rect(x, y, w, h)
-        pygame.draw.rect(view, (16, 16, 20), rect)
-        pygame.draw.rect(view, YELLOW, rect, 2)
+        blits = [(panel, (x, y))]
         cy = y + pad_y
         for i, s in enumerate(options):
             color = YELLOW if i == selected else WHITE
             prefix = "> " if i == selected else "  "
-            self.text(view, prefix + s, (x + pad_x, cy), color)
+            blits.append((self.render_text(self.font, prefix + s, color), (x + pad_x, cy)))
             cy += text_h
+        view.blits(blits, doreturn=0)
 
     # ---- Combat HUDs ----
     def draw_combat_party_windows(self, party: "Party", effects: "HitEffects", highlight: set = None, acting: set = None, offsets: Dict[int, int] = None, offsets_x: Dict[int, int] = None) -> Dict[int, pygame.Rect]:
@@ -940,9 +1236,11 @@ class Renderer:
         x = (WIDTH - total) // 2 + gap
         y = VIEW_H - h - 16
         rects: Dict[int, pygame.Rect] = {}
+        # panels and their labels, in draw order, go out in one blits call
+        blits: List[Tuple[pygame.Surface, Tuple[int, int]]] = []
         for i, m in enumerate(members):
             try:
-                gi = party.members.index(m)
+                gi = party.index_of(m)
             except ValueError:
                 gi = i
             (ox, oy), hit_color = effects.sample("party", gi, base_color=WHITE)
@@ -957,13 +1255,12 @@ class Renderer:
             # Apply optional lunge offset (negative moves up)
             ry = y + oy + int(offsets.get(gi, 0))
             rect = pygame.Rect(rx, ry, w, h)
-            pygame.draw.rect(view, (20, 20, 28), rect)
-            pygame.draw.rect(view, border_col, rect, 2)
-            name = m.name[:14]
-            self.text(view, name, (rx + 8, ry + 6), border_col)
-            self.text_small(view, f"HP {m.hp}/{m.max_hp}", (rx + 8, ry + 26), WHITE)
-            self.text_small(view, f"MP {m.mp}/{m.max_mp}", (rx + w // 2 + 8, ry + 26), WHITE)
+            blits.append((self._panel(w, h, border_col), (rx, ry)))
+            blits.append((self.render_text(self.font, m.name[:14], border_col), (rx + 8, ry + 6)))
+            blits.append((self.render_text(self.font_small, f"HP {m.hp}/{m.max_hp}", WHITE), (rx + 8, ry + 26)))
+            blits.append((self.render_text(self.font_small, f"MP {m.mp}/{m.max_mp}", WHITE), (rx + w // 2 + 8, ry + 26)))
             rects[gi] = rect
+        view.blits(blits, doreturn=0)
         return rects
 
     def draw_combat_enemy_windows(self, enemies: List["Enemy"], effects: "HitEffects", highlight: set = None, acting: set = None, dying: Dict[int, float] = None, offsets: Dict[int, int] = None, offsets_x: Dict[int, int] = None, rotations: Dict[int, float] = None) -> Dict[int, pygame.Rect]:
@@ -974,16 +1271,9 @@ class Renderer:
         offsets_x = offsets_x or {}
         rotations = rotations or {}
         view = self.screen.subsurface(pygame.Rect(0, 0, WIDTH, VIEW_H))
-        alive = [(i, e) for i, e in enumerate(enemies) if e.hp > 0]
-        # include dying entries for fade-out (keep original index order)
-        extra = [(i, enemies[i]) for i in dying.keys() if 0 <= i < len(enemies) and enemies[i].hp <= 0]
-        # merge without duplicates and sort by original index so defeated enemies
-        # animate in-place rather than being pushed to the end
-        merged = {i: e for i, e in alive}
-        for i, e in extra:
-            if i not in merged:
-                merged[i] = e
-        draw_list = sorted(merged.items(), key=lambda t: t[0])
+        # living enemies plus dying ones still fading out, in original index order so
+        # defeated enemies animate in-place rather than being pushed to the end
+        draw_list = [(i, e) for i, e in enumerate(enemies) if e.hp > 0 or i in dying]
         if not draw_list:
             return {}
         n = len(draw_list)
@@ -995,6 +1285,7 @@ class Renderer:
         # Slightly lower enemy windows for better composition
         y = 28
         rects: Dict[int, pygame.Rect] = {}
+        blits: List[Tuple[pygame.Surface, Tuple[int, int]]] = []
         for j, (i, e) in enumerate(draw_list):
             (ox, oy), hit_color = effects.sample("enemy", i, base_color=WHITE)
             border_col = hit_color
@@ -1017,24 +1308,23 @@ class Renderer:
                 pygame.draw.rect(temp, (20, 20, 28), temp.get_rect())
                 pygame.draw.rect(temp, border_col, temp.get_rect(), 2)
                 name = e.name[:14]
-                temp.blit(self.font.render(name, True, border_col), (8, 6))
-                temp.blit(self.font_small.render(f"HP {max(0,e.hp):>2}", True, WHITE), (8, 26))
+                temp.blit(self.render_text(self.font, name, border_col), (8, 6))
+                temp.blit(self.render_text(self.font_small, f"HP {max(0,e.hp):>2}", WHITE), (8, 26))
                 if abs(angle) > 0.01:
                     rot = pygame.transform.rotate(temp, angle)
                     rot.set_alpha(alpha)
                     # center the rotated surface over original rect
                     rrect = rot.get_rect(center=(rx + w // 2, ry + h // 2))
-                    view.blit(rot, rrect.topleft)
+                    blits.append((rot, rrect.topleft))
                 else:
                     temp.set_alpha(alpha)
-                    view.blit(temp, (rx, ry))
+                    blits.append((temp, (rx, ry)))
             else:
-                pygame.draw.rect(view, (20, 20, 28), rect)
-                pygame.draw.rect(view, border_col, rect, 2)
-                name = e.name[:14]
-                self.text(view, name, (rx + 8, ry + 6), border_col)
-                self.text_small(view, f"HP {max(0,e.hp):>2}", (rx + 8, ry + 26), WHITE)
+                blits.append((self._panel(w, h, border_col), (rx, ry)))
+                blits.append((self.render_text(self.font, e.name[:14], border_col), (rx + 8, ry + 6)))
+                blits.append((self.render_text(self.font_small, f"HP {max(0,e.hp):>2}", WHITE), (rx + 8, ry + 26)))
             rects[i] = rect
+        view.blits(blits, doreturn=0)
         return rects
 
 
@@ -1048,8 +1338,12 @@ class MessageLog:
         self._last_tick: int = pygame.time.get_ticks()
         # chars per second; tune for comfortable reading (slower)
         self._cps: float = 70.0
-        # optional sound manager for typewriter sfx
+        # reveal budget in whole ms: one char per _ms_per_char, remainder carried over
+        self._ms_per_char: int = int(round(1000.0 / self._cps))
+        self._elapsed_ms: int = 0
+        # optional sound manager for typewriter sfx, and its bound play()
         self._sfx: Optional[SfxManager] = None
+        self._sfx_play: Optional[Callable[[str, float], None]] = None
         self._typer_last_ms: int = 0
         self._typer_interval_ms: int = 45
 
@@ -1068,29 +1362,32 @@ class MessageLog:
         dt = max(0, now - self._last_tick)
         self._last_tick = now
         self._advance_queue()
-        if self._current:
-            add_chars = int(self._cps * (dt / 1000.0))
-            if add_chars > 0:
-                before = self._reveal_chars
-                self._reveal_chars = min(len(self._current), self._reveal_chars + add_chars)
-                # play soft typewriter sfx while revealing
-                if self._sfx and self._reveal_chars > before:
-                    if now - self._typer_last_ms >= self._typer_interval_ms:
-                        try:
-                            self._sfx.play('typer', 0.35)
-                        except Exception:
-                            pass
-                        self._typer_last_ms = now
-                if self._reveal_chars >= len(self._current):
-                    # push finished line into history, reset current
-                    self.lines.append(self._current)
-                    self._current = ""
-                    self._reveal_chars = 0
-                    # small delay before next line begins revealing
-                    # by leaving update until next frame to pull from queue
+        if not self._current:
+            self._elapsed_ms = 0
+            return
+        self._elapsed_ms += dt
+        add_chars = self._elapsed_ms // self._ms_per_char
+        if add_chars > 0:
+            self._elapsed_ms -= add_chars * self._ms_per_char
+            before = self._reveal_chars
+            self._reveal_chars = min(len(self._current), self._reveal_chars + add_chars)
+            # play soft typewriter sfx while revealing (SfxManager.play swallows mixer errors)
+            if self._sfx_play is not None and self._reveal_chars > before:
+                if now - self._typer_last_ms >= self._typer_interval_ms:
+                    self._sfx_play('typer', 0.35)
+                    self._typer_last_ms = now
+            if self._reveal_chars >= len(self._current):
+                # push finished line into history, reset current
+                self.lines.append(self._current)
+                self._current = ""
+                self._reveal_chars = 0
+                self._elapsed_ms = 0
+                # small delay before next line begins revealing
+                # by leaving update until next frame to pull from queue
 
     def set_sfx(self, sfx: "SfxManager"):
         self._sfx = sfx
+        self._sfx_play = sfx.play if sfx is not None else None
 
     def render_lines(self) -> List[str]:
         # return lines including partially revealed current line (if any)
@@ -1100,6 +1397,17 @@ class MessageLog:
 
 
 # ------------------------------ Battle -------------------------------------
+_TURN_SIDES = ("party", "enemy")  # turn-order side by rank; party wins AGI ties
+
+
+def _prune_expired(timers: Dict[int, Dict[str, int]], now: int):
+    # Drop finished {'start', 'dur'} animation timers in place; most frames drop none,
+    # so the dict is only touched when something actually ended
+    done = [i for i, d in timers.items() if now - d['start'] >= d['dur']]
+    for i in done:
+        del timers[i]
+
+
 class Battle:
     def __init__(self, party: Party, log: MessageLog, effects: HitEffects, items_by_id: Dict[str, Any], monsters_by_id: Dict[str, Any], skills_config: Dict[str, List[Dict[str, Any]]], sfx: Optional["SfxManager"] = None):
         self.party = party
@@ -1163,11 +1471,14 @@ class Battle:
 
     def build_turn_order(self):
         # Build mixed initiative order by AGI (descending). Ties: party before enemy, then index.
-        party_tokens = [("party", i, self.party.members[i].agi_effective) for i in self.party.active if 0 <= i < len(self.party.members) and self.party.members[i].alive and self.party.members[i].hp > 0]
-        enemy_tokens = [("enemy", i, e.agi) for i, e in enumerate(self.enemies) if e.hp > 0]
-        combined = party_tokens + enemy_tokens
-        combined.sort(key=lambda t: (-t[2], 0 if t[0] == 'party' else 1, t[1]))
-        self.turn_order = [(side, ix) for side, ix, _agi in combined]
+        # Tokens are the sort keys themselves, (-agi, side rank, index), so the plain
+        # tuple sort needs no key function.
+        members = self.party.members
+        n = len(members)
+        tokens = [(-members[i].agi_effective, 0, i) for i in self.party.active if 0 <= i < n and members[i].alive and members[i].hp > 0]
+        tokens += [(-e.agi, 1, i) for i, e in enumerate(self.enemies) if e.hp > 0]
+        tokens.sort()
+        self.turn_order = [(_TURN_SIDES[rank], ix) for _agi, rank, ix in tokens]
         if not self.turn_order:
             self.turn_pos = 0
 
@@ -1235,11 +1546,11 @@ class Battle:
             if act is None:
                 # fallback basic attack
                 e = self.enemies[ix]
-                targets = self.party.alive_active_members()
+                targets = self.party.alive_active_indices()
                 if not targets:
                     self.finish_defeat(); return
-                t = random.choice(targets)
-                gi = self.party.members.index(t)
+                gi = random.choice(targets)
+                t = self.party.members[gi]
                 hit = random.random() < 0.65
                 dmg = random.randint(e.atk_low, e.atk_high)
                 act = {
@@ -1259,11 +1570,11 @@ class Battle:
         if e.hp <= 0:
             return None
         # Generic target list
-        targets = self.party.alive_active_members()
+        targets = self.party.alive_active_indices()
         if not targets:
             self.finish_defeat(); return None
-        t = random.choice(targets)
-        gi = self.party.members.index(t)
+        gi = random.choice(targets)
+        t = self.party.members[gi]
         # Dispatch by id
         mid = getattr(e, 'id', e.name.lower())
         # Giant Rat
@@ -1380,7 +1691,16 @@ class Battle:
         return gi if side == 'party' else None
 
     def enemy_alive(self) -> bool:
-        return any(e.hp > 0 for e in self.enemies)
+        # Called several times per turn and every frame from update(); a bare loop
+        # with early exit skips the generator frame any() would resume per enemy
+        for e in self.enemies:
+            if e.hp > 0:
+                return True
+        return False
+
+    def alive_enemy_indices(self) -> List[int]:
+        # Indices of living enemies in on-screen order (target menus, highlights)
+        return [i for i, e in enumerate(self.enemies) if e.hp > 0]
 
     # ---- Turn flow ----
     def begin_player_turn(self):
@@ -1452,7 +1772,7 @@ class Battle:
             if high < low:
                 low, high = high, low
             mp = random.randint(low, high)
-            gi = self.party.members.index(actor)
+            gi = self.party.index_of(actor)
             return {
                 'type': 'mp', 'actor_side': 'party', 'actor_index': gi,
                 'target_side': 'party', 'target_index': target_gi,
@@ -1464,7 +1784,7 @@ class Battle:
         if high < low:
             low, high = high, low
         heal = random.randint(low, high)
-        gi = self.party.members.index(actor)
+        gi = self.party.index_of(actor)
         return {
             'type': 'heal', 'actor_side': 'party', 'actor_index': gi,
             'target_side': 'party', 'target_index': target_gi,
@@ -1476,8 +1796,8 @@ class Battle:
         # prune floaters
         self.floaters = [f for f in self.floaters if now - f['start'] < f['dur']]
         # prune finished defeat animations
-        self.dying_enemies = {i: d for i, d in self.dying_enemies.items() if now - d['start'] < d['dur']}
-        self.downed_party = {i: d for i, d in self.downed_party.items() if now - d['start'] < d['dur']}
+        _prune_expired(self.dying_enemies, now)
+        _prune_expired(self.downed_party, now)
         # Safety: if all enemies are defeated and no death animations remain, finalize victory
         if not self.battle_over and not self.dying_enemies and not self.enemy_alive():
             self.finish_victory()
@@ -1529,11 +1849,8 @@ class Battle:
                 # During pre-impact for Goblin Trip, play a MISS sfx once before the spin
                 if stage == 1 and act.get('type') == 'trip' and not a.get('trip_pre_sfx'):
                     a['trip_pre_sfx'] = True
-                    try:
-                        if self.sfx:
-                            self.sfx.play('miss', 0.6)
-                    except Exception:
-                        pass
+                    if self.sfx:
+                        self.sfx.play('miss', 0.6)
         elif self.state == 'postpause' and now >= self.pause_until:
             if self.check_end_and_maybe_finish():
                 return
@@ -1551,11 +1868,9 @@ class Battle:
                     if 0 <= i < len(self.enemies):
                         self.enemies[i].hp -= dmg
                         self.effects.trigger('enemy', i, 300, 7)
-                        try:
-                            # enemy hurt sfx
+                        # enemy hurt sfx
+                        if self.sfx:
                             self.sfx.play('enemy_hurt', 0.7)
-                        except Exception:
-                            pass
                         # damage floater (enemy)
                         self.add_floater('enemy', i, str(dmg), 800, WHITE)
                         if self.enemies[i].hp <= 0:
@@ -1567,11 +1882,9 @@ class Battle:
                     if 0 <= gi < len(self.party.members):
                         t = self.party.members[gi]
                         t.hp -= dmg
-                        try:
-                            # party hurt sfx
+                        # party hurt sfx
+                        if self.sfx:
                             self.sfx.play('party_hurt', 0.7)
-                        except Exception:
-                            pass
                         # damage floater (party)
                         self.add_floater('party', gi, str(dmg), 800, WHITE)
                         if t.hp <= 0:
@@ -1585,10 +1898,8 @@ class Battle:
                 idx = act['target_index']
                 side = act['target_side']
                 self.add_floater(side, idx, 'MISS', 700, WHITE)
-                try:
+                if self.sfx:
                     self.sfx.play('miss', 0.6)
-                except Exception:
-                    pass
                 self.log.add(act.get('miss_label', 'The attack misses.'))
         elif act['type'] == 'heal':
             gi = act['target_index']
@@ -1599,10 +1910,8 @@ class Battle:
                 t.hp = min(t.max_hp, t.hp + amt)
                 # heal floater (party)
                 self.add_floater('party', gi, str(amt), 800, YELLOW)
-                try:
+                if self.sfx:
                     self.sfx.play('heal', 0.6)
-                except Exception:
-                    pass
                 self.log.add(f"{act.get('actor_name','Priest')} heals {t.name} for {t.hp - before}.")
         elif act['type'] == 'mp':
             gi = act['target_index']
@@ -1613,10 +1922,8 @@ class Battle:
                 t.mp = min(t.max_mp, t.mp + amt)
                 # MP floater (party)
                 self.add_floater('party', gi, str(amt), 800, BLUE)
-                try:
+                if self.sfx:
                     self.sfx.play('heal', 0.5)
-                except Exception:
-                    pass
                 self.log.add(f"{act.get('actor_name','Adventurer')} restores {t.name}'s MP by {t.mp - before}.")
         elif act['type'] == 'emote':
             # Enemy emote/log only
@@ -1632,10 +1939,8 @@ class Battle:
                 e.hp = max(0, e.hp + amt)
                 # heal floater (enemy)
                 self.add_floater('enemy', ix, str(amt), 800, YELLOW)
-                try:
+                if self.sfx:
                     self.sfx.play('heal', 0.5)
-                except Exception:
-                    pass
                 self.log.add(act.get('label', f"{e.name} heals."))
         elif act['type'] == 'pulse':
             ix = act.get('actor_index', -1)
@@ -1647,7 +1952,7 @@ class Battle:
             ix = act.get('actor_index', -1)
             if 0 <= ix < len(self.enemies):
                 e = self.enemies[ix]
-                alive_gi = [i for i in self.party.active if 0 <= i < len(self.party.members) and self.party.members[i].alive and self.party.members[i].hp > 0]
+                alive_gi = self.party.alive_active_indices()
                 hits = 0
                 for gi in alive_gi:
                     t = self.party.members[gi]
@@ -1663,11 +1968,8 @@ class Battle:
                 self.log.add(act.get('label', f"{e.name} splashes!"))
                 # play party hurt sfx once when splash lands
                 if hits > 0:
-                    try:
-                        if self.sfx:
-                            self.sfx.play('party_hurt', 0.7)
-                    except Exception:
-                        pass
+                    if self.sfx:
+                        self.sfx.play('party_hurt', 0.7)
                 # Clear pulse flag
                 if ix in self.slime_pulsed:
                     self.slime_pulsed.pop(ix, None)
@@ -1797,7 +2099,7 @@ class Battle:
         hit_chance = 0.65 + actor.atk_bonus * 0.03 - (10 - e.ac) * 0.02
         hit = random.random() < hit_chance
         dmg = max(1, random.randint(1, 6) + actor.atk_bonus)
-        gi = self.party.members.index(actor)
+        gi = self.party.index_of(actor)
         return {
             'type': 'attack', 'actor_side': 'party', 'actor_index': gi,
             'target_side': 'enemy', 'target_index': target_i,
@@ -1815,7 +2117,7 @@ class Battle:
             return None
         actor.mp -= 1
         dmg = max(1, random.randint(4, 8) + ability_mod(actor.iq))
-        gi = self.party.members.index(actor)
+        gi = self.party.index_of(actor)
         e = self.enemies[target_i]
         return {
             'type': 'spell', 'actor_side': 'party', 'actor_index': gi,
@@ -1831,10 +2133,10 @@ class Battle:
             target = min((m for m in self.party.active_members() if m.alive), key=lambda c: c.hp / max(1, c.max_hp), default=None)
             if not target:
                 return None
-            target_gi = self.party.members.index(target)
+            target_gi = self.party.index_of(target)
         actor.mp -= 1
         amt = max(1, random.randint(6, 10) + ability_mod(actor.piety))
-        gi = self.party.members.index(actor)
+        gi = self.party.index_of(actor)
         return {
             'type': 'heal', 'actor_side': 'party', 'actor_index': gi,
             'target_side': 'party', 'target_index': target_gi,
@@ -2008,6 +2310,9 @@ class Game:
         # Persistent state: fog-of-war and level chests
         self.seen_by_level: Dict[int, set] = {}
         self.chests_state: Dict[int, List[Dict[str, Any]]] = {}
+        # Last compute_visible_tiles result and the inputs it was computed from
+        self._visible_key: Optional[tuple] = None
+        self._visible_tiles: set = set()
 
         # Treasure popup
         self.treasure_popup_active: bool = False
@@ -2028,8 +2333,8 @@ class Game:
 
     def load_json(self, path: str, default):
         try:
-            with open(path) as f:
-                return json.load(f)
+            with open(path, 'rb') as f:
+                return _loads(f.read())
         except Exception:
             return default
 
@@ -2041,8 +2346,8 @@ class Game:
         # Shop stock (ids) — if not present, default to all items
         stock_path = os.path.join('data', 'shop.json')
         try:
-            with open(stock_path) as f:
-                stock_ids = json.load(f)
+            with open(stock_path, 'rb') as f:
+                stock_ids = _loads(f.read())
         except Exception:
             stock_ids = [it.get('id') for it in items if it.get('id')]
         # Expose to module-level for existing code paths
@@ -2125,9 +2430,7 @@ class Game:
         view = self.screen.subsurface(pygame.Rect(0, 0, WIDTH, VIEW_H))
         # Quick white flash; no popup
         if dt < 120:
-            overlay = pygame.Surface((WIDTH, VIEW_H), pygame.SRCALPHA)
-            overlay.fill((255, 255, 255, 220))
-            view.blit(overlay, (0, 0))
+            self.r.shade(view, (255, 255, 255, 220))
         else:
             # End feedback quickly and return to town
             self.save_feedback_active = False
@@ -2144,9 +2447,7 @@ class Game:
             dur = 400
             p = max(0.0, min(1.0, dt / dur))
             alpha = int(255 * p)
-            overlay = pygame.Surface((WIDTH, VIEW_H), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, alpha))
-            view.blit(overlay, (0, 0))
+            self.r.shade(view, (0, 0, 0, alpha))
             if dt >= dur:
                 # Perform the load once, then switch to town and fade back in
                 try:
@@ -2162,9 +2463,7 @@ class Game:
             dur = 500
             p = max(0.0, min(1.0, dt / dur))
             alpha = int(255 * (1.0 - p))
-            overlay = pygame.Surface((WIDTH, VIEW_H), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, alpha))
-            view.blit(overlay, (0, 0))
+            self.r.shade(view, (0, 0, 0, alpha))
             if dt >= dur:
                 self.load_feedback_active = False
 
@@ -2184,10 +2483,8 @@ class Game:
             # overlay increasing black
             p = max(0.0, min(1.0, t / max(1, fade_out_ms)))
             alpha = int(255 * p)
-            overlay = pygame.Surface((WIDTH, VIEW_H), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, alpha))
             view = self.screen.subsurface(pygame.Rect(0, 0, WIDTH, VIEW_H))
-            view.blit(overlay, (0, 0))
+            self.r.shade(view, (0, 0, 0, alpha))
             if t >= fade_out_ms:
                 self.scene_stage = 1
                 self.scene_t0 = now
@@ -2206,10 +2503,8 @@ class Game:
                 self.draw_maze()
             p = max(0.0, min(1.0, t / max(1, fade_in_ms)))
             alpha = int(255 * (1.0 - p))
-            overlay = pygame.Surface((WIDTH, VIEW_H), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, alpha))
             view = self.screen.subsurface(pygame.Rect(0, 0, WIDTH, VIEW_H))
-            view.blit(overlay, (0, 0))
+            self.r.shade(view, (0, 0, 0, alpha))
             if t >= fade_in_ms:
                 # end transition
                 self.scene_active = False
@@ -2238,8 +2533,8 @@ class Game:
         if not os.path.exists(path):
             self.log.add("No save file found.")
             return
-        with open(path) as f:
-            data = json.load(f)
+        with open(path, 'rb') as f:
+            data = _loads(f.read())
         self.party = Party.from_dict(data.get("party", {}))
         self.level_ix = int(data.get("level", 0))
         self.dun.ensure_level(self.level_ix)
@@ -2472,9 +2767,7 @@ class Game:
             self.r.draw_center_menu(opts + ["Back"], self.party_dismiss_index)
         elif self.party_mode == 'dismiss_confirm':
             # darken background
-            s = pygame.Surface((WIDTH, VIEW_H), pygame.SRCALPHA)
-            s.fill((0, 0, 0, 160))
-            view.blit(s, (0, 0))
+            self.r.shade(view, (0, 0, 0, 160))
             # message and yes/no menu
             if self.party.members:
                 name = self.party.members[self.party_dismiss_index % len(self.party.members)].name
@@ -2796,8 +3089,7 @@ class Game:
             self.r.draw_center_menu(options, self.shop_buy_ix)
         elif self.shop_phase == 'buy_confirm':
             # Darken and show confirmation
-            s = pygame.Surface((WIDTH, VIEW_H), pygame.SRCALPHA)
-            s.fill((0,0,0,160)); view.blit(s,(0,0))
+            self.r.shade(view, (0, 0, 0, 160))
             name = self.shop_pending_name or 'Item'
             gold = self.shop_pending_gold
             msg = f"Do you want to buy {name} for {gold}g?"
@@ -2827,8 +3119,7 @@ class Game:
             self.shop_sell_item_ix = self.shop_sell_item_ix % max(1, len(options))
             self.r.draw_center_menu(options, self.shop_sell_item_ix)
         if self.shop_phase == 'sell_confirm':
-            s = pygame.Surface((WIDTH, VIEW_H), pygame.SRCALPHA)
-            s.fill((0,0,0,160)); view.blit(s,(0,0))
+            self.r.shade(view, (0, 0, 0, 160))
             name = self.shop_pending_name or 'Item'
             gold = self.shop_pending_gold
             msg = f"Do you want to sell {name} for {gold}g?"
@@ -3087,9 +3378,7 @@ class Game:
         self.r.draw_center_menu(opts, self.saveload_index)
         # Confirmation popup overlay
         if getattr(self, 'saveload_confirm_active', False):
-            s = pygame.Surface((WIDTH, VIEW_H), pygame.SRCALPHA)
-            s.fill((0, 0, 0, 160))
-            view.blit(s, (0, 0))
+            self.r.shade(view, (0, 0, 0, 160))
             title = "Save game?" if self.saveload_confirm_kind == 'save' else "Load game?"
             self.r.text_big(view, title, (WIDTH//2 - 120, 100), YELLOW)
             self.r.draw_center_menu(["Yes", "No"], self.saveload_confirm_index)
@@ -3149,7 +3438,7 @@ class Game:
                 self.mode = MODE_TOWN
 
     # --------------- Maze Helpers ---------------
-    def grid(self) -> List[List[int]]:
+    def grid(self) -> Grid:
         return self.dun.levels[self.level_ix].grid
 
     def in_bounds(self, x, y):
@@ -3297,45 +3586,38 @@ class Game:
         if self.mode == MODE_COMBAT_INTRO and self.combat_intro_active:
             now = pygame.time.get_ticks()
             t = now - self.combat_intro_t0
-            overlay = pygame.Surface((WIDTH, VIEW_H), pygame.SRCALPHA)
             if self.combat_intro_stage in (0, 2):
                 alpha = 220 if (self.combat_intro_stage == 0 and t < 180) or (self.combat_intro_stage == 2 and t < 180) else 0
-                overlay.fill((255, 255, 255, alpha))
-            view.blit(overlay, (0, 0))
+                self.r.shade(view, (255, 255, 255, alpha))
 
     def compute_visible_tiles(self, radius: int = 4, spread_deg: float = 80.0) -> set:
         # Compute LOS-visible tiles around player using renderer helpers
         grid = self.grid()
         px, py = self.pos
         facing = self.facing
+        # The result only changes when the player moves or turns, or a tile in range
+        # changes (e.g. a door opens), so reuse it while those stay the same
+        window = b''.join(row[max(0, px - radius):px + radius + 1] for row in grid[max(0, py - radius):py + radius + 1])
+        key = (id(grid), len(grid), len(grid[0]), px, py, facing, radius, spread_deg, window)
+        if key == self._visible_key:
+            return self._visible_tiles
         visible: set = set()
         try:
-            ang_face = self.r._angle_for_facing(facing)
-            half = math.radians(spread_deg) / 2.0
-            pxf, pyf = float(px), float(py)
-            for ty in range(py - radius, py + radius + 1):
-                if not (0 <= ty < len(grid)):
-                    continue
-                for tx in range(px - radius, px + radius + 1):
-                    if not (0 <= tx < len(grid[0])):
-                        continue
-                    dx = tx - pxf; dy = ty - pyf
-                    if dx * dx + dy * dy > (radius + 0.5) * (radius + 0.5):
-                        continue
-                    ang = math.atan2(dy, dx)
-                    near3 = (max(abs(dx), abs(dy)) <= 1.0)
-                    if not near3:
-                        if self.r._angle_diff(ang, ang_face) > half:
-                            continue
-                        los_px, los_py = int(round(pxf)), int(round(pyf))
-                        if not self.r._los_clear(grid, los_px, los_py, tx, ty):
-                            continue
+            # Distance and cone tests are baked into the cached offset table; only bounds
+            # and LOS depend on where the player stands
+            gw, gh = len(grid[0]), len(grid)
+            los_clear = self.r._los_clear
+            for dx, dy, near3 in self.r._fov_offsets(radius, spread_deg, facing):
+                tx, ty = px + dx, py + dy
+                if 0 <= tx < gw and 0 <= ty < gh and (near3 or los_clear(grid, px, py, tx, ty)):
                     visible.add((tx, ty))
         except Exception:
             # Fallback: simple radius without LOS
             for ty in range(py - radius, py + radius + 1):
                 for tx in range(px - radius, px + radius + 1):
                     visible.add((tx, ty))
+        self._visible_key = key
+        self._visible_tiles = visible
         return visible
 
     def apply_level_state(self, ix: int):
@@ -3406,19 +3688,15 @@ class Game:
         # Ease-out alpha over duration
         p = max(0.0, min(1.0, dt / float(dur)))
         alpha = int(160 * (1.0 - p))
-        overlay = pygame.Surface((WIDTH, VIEW_H), pygame.SRCALPHA)
-        overlay.fill((200, 40, 40, alpha))
         view = self.screen.subsurface(pygame.Rect(0, 0, WIDTH, VIEW_H))
-        view.blit(overlay, (0, 0))
+        self.r.shade(view, (200, 40, 40, alpha))
 
     def draw_treasure_popup(self):
         if not getattr(self, 'treasure_popup_active', False):
             return
         view = self.screen.subsurface(pygame.Rect(0, 0, WIDTH, VIEW_H))
         # Dim background
-        s = pygame.Surface((WIDTH, VIEW_H), pygame.SRCALPHA)
-        s.fill((0, 0, 0, 160))
-        view.blit(s, (0, 0))
+        self.r.shade(view, (0, 0, 0, 160))
         # Popup window
         pad_x, pad_y = 14, 12
         title = "Treasure Found!"
@@ -3439,9 +3717,7 @@ class Game:
         if not getattr(self, 'door_confirm_active', False):
             return
         view = self.screen.subsurface(pygame.Rect(0, 0, WIDTH, VIEW_H))
-        overlay = pygame.Surface((WIDTH, VIEW_H), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 160))
-        view.blit(overlay, (0, 0))
+        self.r.shade(view, (0, 0, 0, 160))
         # Centered confirm box
         msg = "Use a Key to unlock?"
         text_h = self.r.font.get_height()
@@ -3514,9 +3790,7 @@ class Game:
     # --------------- Pause Menu & Items ---------------
     def draw_pause(self):
         view = self.screen.subsurface(pygame.Rect(0, 0, WIDTH, VIEW_H))
-        s = pygame.Surface((WIDTH, VIEW_H), pygame.SRCALPHA)
-        s.fill((0, 0, 0, 160))
-        view.blit(s, (0, 0))
+        self.r.shade(view, (0, 0, 0, 160))
         if self.pause_confirming_quit:
             # Confirm quit prompt
             self.r.text_big(view, "Are you sure?", (WIDTH//2 - 100, 100), YELLOW)
@@ -3930,7 +4204,7 @@ class Game:
                     if chosen_id == 'attack':
                         b.state = 'target'
                         b.target_mode = {'side': 'enemy', 'action': 'attack'}
-                        alive_enemy_indices = [i for i, e in enumerate(b.enemies) if e.hp > 0]
+                        alive_enemy_indices = b.alive_enemy_indices()
                         b.target_menu_index = 0
                         if not alive_enemy_indices:
                             b.begin_player_turn()
@@ -3984,7 +4258,7 @@ class Game:
                 if not b.target_mode:
                     b.begin_player_turn(); return
                 if b.target_mode['side'] == 'enemy':
-                    alive = [i for i, e in enumerate(b.enemies) if e.hp > 0]
+                    alive = b.alive_enemy_indices()
                     if not alive:
                         b.begin_player_turn(); return
                     if event.key in (pygame.K_LEFT, pygame.K_h):
@@ -4008,9 +4282,7 @@ class Game:
                         b.state = 'menu'
                 else:
                     # party targeting (for heal) — follow on-screen order (self.party.active)
-                    alive_gi = [i for i in self.party.active
-                                if 0 <= i < len(self.party.members)
-                                and self.party.members[i].alive and self.party.members[i].hp > 0]
+                    alive_gi = self.party.alive_active_indices()
                     if not alive_gi:
                         b.begin_player_turn(); return
                     if event.key in (pygame.K_LEFT, pygame.K_h):
@@ -4099,13 +4371,11 @@ class Game:
             if b.state == 'target':
                 if b.target_mode and b.target_mode.get('side') == 'party':
                     # Highlight using on-screen order
-                    alive_gi = [i for i in self.party.active
-                                if 0 <= i < len(self.party.members)
-                                and self.party.members[i].alive and self.party.members[i].hp > 0]
+                    alive_gi = self.party.alive_active_indices()
                     if alive_gi:
                         party_highlight.add(alive_gi[b.target_menu_index])
                 else:
-                    alive = [i for i, e in enumerate(b.enemies) if e.hp > 0]
+                    alive = b.alive_enemy_indices()
                     if alive:
                         enemy_highlight.add(alive[b.target_menu_index])
             if b.state == 'anim' and b.anim:
@@ -4297,17 +4567,15 @@ class Game:
         if self.combat_intro_active:
             now = pygame.time.get_ticks()
             t = now - self.combat_intro_t0
-            overlay = pygame.Surface((WIDTH, VIEW_H), pygame.SRCALPHA)
             if self.combat_intro_stage in (0, 2):
                 # white flash
                 alpha = 200 if t < 120 else 0
-                overlay.fill((255, 255, 255, alpha))
+                self.r.shade(view, (255, 255, 255, alpha))
             elif self.combat_intro_stage == 3:
                 # fade from black to transparent
                 # at t=0 alpha=255, at t=500 alpha=0
                 alpha = max(0, 255 - int(255 * (t / 500.0)))
-                overlay.fill((0, 0, 0, alpha))
-            view.blit(overlay, (0, 0))
+                self.r.shade(view, (0, 0, 0, alpha))
 
         # Draw floaters (damage, heal, MISS) above windows, on top of overlays
         if b:
@@ -4415,9 +4683,7 @@ class Game:
         t = now - self.defeat_t0
         dur = 900
         alpha = max(0, min(255, int(255 * (t / dur))))
-        overlay = pygame.Surface((WIDTH, VIEW_H), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, alpha))
-        view.blit(overlay, (0, 0))
+        self.r.shade(view, (0, 0, 0, alpha))
         pad_x, pad_y = 14, 12
         title = "Defeat..."
         msg = "Your party has fallen."